@@ -1,11 +1,26 @@
 
 import polars as pl
 import pathlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 from rich.table import Table
 
 console = Console()
 
+# Literal patterns for the email corruption check (built once, matched without regex)
+EMAIL_CORRUPT_MARKER = "??"
+EMAIL_AT = "@"
+
+def scan(path: pathlib.Path) -> pl.LazyFrame:
+    """Lazy parquet scan reading row groups in parallel; only aggregates are collected."""
+    return pl.scan_parquet(path, parallel="row_groups", use_statistics=True)
+
+@functools.lru_cache(maxsize=None)
+def parquet_columns(path: pathlib.Path) -> frozenset[str]:
+    """Column names from the parquet footer only (no data pages read), cached per file."""
+    return frozenset(pl.read_parquet_schema(path))
+
 def get_latest_run(base_path: pathlib.Path) -> pathlib.Path:
     runs = sorted([d for d in base_path.iterdir() if d.is_dir() and d.name.startswith("data_")])
     if not runs:
@@ -17,66 +32,112 @@ def verify_orders(path: pathlib.Path):
         console.print(f"[yellow]⚠️ Orders file not found: {path}[/yellow]")
         return
 
-    df = pl.read_parquet(path)
-    total = len(df)
-    console.print(f"\n[bold blue]Analyzing Orders ({total} rows)[/bold blue]")
+    cols = parquet_columns(path)
+    lf = scan(path)
+
+    # Single fused scan: every metric is an aggregate over the same plan
+    exprs = [
+        pl.len().alias("total"),
+        (pl.len() - pl.struct(pl.all()).n_unique()).alias("dupes"),
+    ]
+    if "store_id" in cols:
+        exprs.append(pl.col("store_id").null_count().alias("null_store"))
+    if "order_date" in cols:
+        exprs.append(pl.col("order_date").null_count().alias("null_date"))
+    if "total_amount" in cols:
+        exprs.append((pl.col("total_amount") < 0).sum().alias("negs"))
+        # High outliers (simple heuristic > 10000 or config based)
+        # We assume mean is around 50-100, so > 5000 is likely outlier
+        exprs.append((pl.col("total_amount") > 5000).sum().alias("outliers"))
+
+    row = lf.select(exprs).collect(engine="streaming").row(0, named=True)
+    total = row["total"]
+    inv = 100.0 / total if total else 0.0
+    lines = [f"\n[bold blue]Analyzing Orders ({total} rows)[/bold blue]"]
 
     # Duplicates
-    dupes = df.is_duplicated().sum()
-    console.print(f"  - Duplicates: {dupes} ({dupes/total:.2%})")
+    dupes = row["dupes"]
+    lines.append(f"  - Duplicates: {dupes} ({dupes * inv:.2f}%)")
 
     # Nulls
-    if "store_id" in df.columns:
-        nulls = df["store_id"].null_count()
-        console.print(f"  - Null store_id: {nulls} ({nulls/total:.2%})")
-    
-    if "order_date" in df.columns:
-        nulls = df["order_date"].null_count()
-        console.print(f"  - Null order_date: {nulls} ({nulls/total:.2%})")
+    if "null_store" in row:
+        nulls = row["null_store"]
+        lines.append(f"  - Null store_id: {nulls} ({nulls * inv:.2f}%)")
+
+    if "null_date" in row:
+        nulls = row["null_date"]
+        lines.append(f"  - Null order_date: {nulls} ({nulls * inv:.2f}%)")
 
     # Outliers
-    if "total_amount" in df.columns:
-        negs = df.filter(pl.col("total_amount") < 0).height
-        console.print(f"  - Negative Amounts: {negs} ({negs/total:.2%})")
-        
-        # High outliers (simple heuristic > 10000 or config based)
-        # We assume mean is around 50-100, so > 5000 is likely outlier
-        outliers = df.filter(pl.col("total_amount") > 5000).height
-        console.print(f"  - High Outliers (>5000): {outliers} ({outliers/total:.2%})")
+    if "negs" in row:
+        negs = row["negs"]
+        lines.append(f"  - Negative Amounts: {negs} ({negs * inv:.2f}%)")
+
+        outliers = row["outliers"]
+        lines.append(f"  - High Outliers (>5000): {outliers} ({outliers * inv:.2f}%)")
+
+    # One write per report (also keeps concurrent reports from interleaving)
+    console.print("\n".join(lines))
 
 def verify_customers(path: pathlib.Path):
     if not path.exists():
         console.print(f"[yellow]⚠️ Customers file not found: {path}[/yellow]")
         return
 
-    df = pl.read_parquet(path)
-    total = len(df)
-    console.print(f"\n[bold blue]Analyzing Customers ({total} rows)[/bold blue]")
-
-    dupes = df.is_duplicated().sum()
-    console.print(f"  - Duplicates: {dupes} ({dupes/total:.2%})")
-
-    if "email" in df.columns:
-        # Check for malformed emails (simple regex or just not containing @)
-        # Contains '??' or spaces often indicates corruption in this context
-        corrupt = df.filter(
-            pl.col("email").str.contains(r"\?\?") | 
-            ~pl.col("email").str.contains("@")
-        ).height
-        console.print(f"  - Header/Corrupt Emails: {corrupt} ({corrupt/total:.2%})")
+    cols = parquet_columns(path)
+    lf = scan(path)
+
+    exprs = [
+        pl.len().alias("total"),
+        (pl.len() - pl.struct(pl.all()).n_unique()).alias("dupes"),
+    ]
+    if "email" in cols:
+        # Check for malformed emails (literal substring search, no regex engine)
+        # Contains '??' or missing '@' often indicates corruption in this context
+        # One boolean kernel reduced in the same select as the other metrics
+        email = pl.col("email")
+        exprs.append((
+            ~email.str.contains(EMAIL_AT, literal=True) |
+            email.str.contains(EMAIL_CORRUPT_MARKER, literal=True)
+        ).sum().alias("corrupt"))
+
+    row = lf.select(exprs).collect(engine="streaming").row(0, named=True)
+    total = row["total"]
+    inv = 100.0 / total if total else 0.0
+    lines = [f"\n[bold blue]Analyzing Customers ({total} rows)[/bold blue]"]
+
+    dupes = row["dupes"]
+    lines.append(f"  - Duplicates: {dupes} ({dupes * inv:.2f}%)")
+
+    if "corrupt" in row:
+        corrupt = row["corrupt"]
+        lines.append(f"  - Header/Corrupt Emails: {corrupt} ({corrupt * inv:.2f}%)")
+
+    console.print("\n".join(lines))
 
 def verify_products(path: pathlib.Path):
     if not path.exists():
         console.print(f"[yellow]⚠️ Products file not found: {path}[/yellow]")
         return
-    
-    df = pl.read_parquet(path)
-    total = len(df)
-    console.print(f"\n[bold blue]Analyzing Products ({total} rows)[/bold blue]")
 
-    if "category" in df.columns:
-        nulls = df["category"].null_count()
-        console.print(f"  - Null Category: {nulls} ({nulls/total:.2%})")
+    cols = parquet_columns(path)
+    lf = scan(path)
+
+    # Projection pushdown: only the 'category' column chunk is read
+    exprs = [pl.len().alias("total")]
+    if "category" in cols:
+        exprs.append(pl.col("category").null_count().alias("null_category"))
+
+    row = lf.select(exprs).collect(engine="streaming").row(0, named=True)
+    total = row["total"]
+    inv = 100.0 / total if total else 0.0
+    lines = [f"\n[bold blue]Analyzing Products ({total} rows)[/bold blue]"]
+
+    if "null_category" in row:
+        nulls = row["null_category"]
+        lines.append(f"  - Null Category: {nulls} ({nulls * inv:.2f}%)")
+
+    console.print("\n".join(lines))
 
 def main():
     root = pathlib.Path("data/sales")
@@ -88,9 +149,15 @@ def main():
         latest = get_latest_run(root)
         console.print(f"[bold green]Verifying run: {latest.name}[/bold green]")
         
-        verify_orders(latest / "orders.parquet")
-        verify_customers(latest / "customers.parquet")
-        verify_products(latest / "products.parquet")
+        # Independent files: polars releases the GIL, so scans overlap
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            futures = [
+                ex.submit(verify_orders, latest / "orders.parquet"),
+                ex.submit(verify_customers, latest / "customers.parquet"),
+                ex.submit(verify_products, latest / "products.parquet"),
+            ]
+            for f in futures:
+                f.result()
 
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
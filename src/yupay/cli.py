@@ -1,19 +1,8 @@
 from datetime import datetime, timedelta
 import pathlib
 import click
-import polars as pl
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Confirm
-
-from yupay.core.settings import Settings
-from yupay.core.system import DiskGuard, MemoryGuard
-from yupay.core.filesystem import OutputManager
-from yupay.core.time import TimeEngine
-from yupay.core.time import TimeEngine
-from yupay.domains.sales.orders import SalesDataset
-from yupay.core.registry import DomainRegistry
+
 from yupay.core.i18n import _
 
 console = Console()
@@ -27,14 +16,8 @@ def main():
         from yupay.core.settings import Settings
         from yupay.core.i18n import setup_i18n
 
-        settings = Settings()
-        # Lightweight load just for locale
-        defaults = settings.load_defaults()
-        user_config = settings.load_user_config()
-        # We don't have domain config here, but typically locale is in defaults/main
-        final = settings.merge_configs(defaults, user_config)
-
-        loc_setting = final.get("locale", "es_PE")
+        # Lightweight load: only the 'locale' key (cached YAML read)
+        loc_setting = Settings().load_locale_setting()
         lang = loc_setting[:2] if isinstance(loc_setting, str) else "es"
         setup_i18n(lang)
 
@@ -50,6 +33,12 @@ def generate(domain):
     """Generate synthetic data using YAML configuration (config/main.yaml)."""
 
     # 0. Imports Lazy (to avoid circularity or early load)
+    from rich.table import Table
+    from rich.panel import Panel
+    from yupay.core.settings import Settings
+    from yupay.core.system import MemoryGuard
+    from yupay.core.filesystem import OutputManager
+    from yupay.core.registry import DomainRegistry
     from yupay.core.estimator import SizeEstimator
     from yupay.sinks.definitions import SinkFactory
 
@@ -168,7 +157,14 @@ def generate(domain):
 
         # Instantiate and Execute
         handler = handler_cls()
-        results = handler.execute(full_config, sink, status, console)
+        # Loaded once here and shared with the handler (no per-handler locale parse)
+        shared_ctx = {"locale": settings.load_locale(full_config.get("locale", "es_PE"))}
+        try:
+            # GC tuned only around the generation itself (restored on every exit path)
+            MemoryGuard.tune_gc_for_bulk()
+            results = handler.execute(full_config, sink, status, console, shared_ctx=shared_ctx)
+        finally:
+            MemoryGuard.restore_gc()
 
     # 6. Resumen (Restored)
     table = Table(title=_("Generation Summary"))
@@ -183,9 +179,9 @@ def generate(domain):
     peak_gb = MemoryGuard._peak_rss_gb
     peak_sys = MemoryGuard._peak_system_pct
 
-    # Calculate Final Size
+    # Calculate Final Size (reported by the sink; walk the folder only as fallback)
     from yupay.utils.files import get_dir_size, format_size
-    final_size_bytes = get_dir_size(run_dir)
+    final_size_bytes = sink.bytes_written or get_dir_size(run_dir)
     final_size_str = format_size(final_size_bytes)
 
     console.print(Panel(
@@ -210,26 +206,35 @@ def list_cmd(domain, all):
     """Lists generated datasets and their size."""
     from yupay.utils.files import list_datasets
 
-    data = list_datasets()
+    data = list_datasets(domain_filter=None if all else domain)
     if not data:
         console.print(_("[yellow]No datasets found in ./data[/yellow]"))
         return
 
-    table = Table(title=_("Available Datasets"))
-    table.add_column(_("Domain"), style="cyan")
-    table.add_column(_("Run ID"), style="green")
-    table.add_column(_("Size"), justify="right")
-    table.add_column(_("Date"), style="dim")
-
+    headers = (_("Domain"), _("Run ID"), _("Size"), _("Date"))
+    rows = []
     for dom, runs in data.items():
-        if domain and dom != domain:
-            continue
-
         for run in runs:
             # Simple timestamp formatting
             ts = datetime.fromtimestamp(
                 run["timestamp"]).strftime("%Y-%m-%d %H:%M")
-            table.add_row(dom, run["run_id"], run["size_formatted"], ts)
+            rows.append((dom, run["run_id"], run["size_formatted"], ts))
+
+    # Piped/redirected output: plain TSV, no Rich markup or table layout
+    if not console.is_terminal:
+        click.echo("\n".join("\t".join(r) for r in (headers, *rows)))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=_("Available Datasets"))
+    table.add_column(headers[0], style="cyan")
+    table.add_column(headers[1], style="green")
+    table.add_column(headers[2], justify="right")
+    table.add_column(headers[3], style="dim")
+
+    for row in rows:
+        table.add_row(*row)
 
     console.print(table)
 
@@ -240,19 +245,19 @@ def list_cmd(domain, all):
 @click.option("--force", "-f", is_flag=True, help="Sin confirmación")
 def clear_cmd(domain, all, force):
     """Delete generated datasets."""
+    from rich.prompt import Confirm
     from yupay.utils.files import list_datasets, delete_datasets
 
     if not (domain or all):
         console.print(_("[yellow]Specify --domain [name] or --all[/yellow]"))
         return
 
-    data = list_datasets()
+    data = list_datasets(domain_filter=None if all else domain)
     targets = []
 
     for dom, runs in data.items():
-        if all or (domain and dom == domain):
-            for run in runs:
-                targets.append(pathlib.Path(run["path"]))
+        for run in runs:
+            targets.append(pathlib.Path(run["path"]))
 
     if not targets:
         console.print(_("[yellow]Nothing to delete.[/yellow]"))
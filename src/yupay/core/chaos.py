@@ -9,99 +9,98 @@ class ChaosEngine:
         self.seed = config.get("seed", 42)
         self.rng = random.Random(self.seed)
 
-    def apply(self, df: pl.DataFrame, table_name: str) -> pl.DataFrame:
-        """Applies configured chaos rules to a DataFrame."""
+    @staticmethod
+    def is_active(config: dict, table_name: str) -> bool:
+        """True if chaos is enabled and has rules for table_name (lets callers skip the engine)."""
+        chaos_cfg = config.get("chaos", {})
+        return bool(chaos_cfg.get("enabled", False) and chaos_cfg.get("rules", {}).get(table_name))
+
+    def apply(self, lf: pl.LazyFrame, table_name: str) -> pl.LazyFrame:
+        """Applies configured chaos rules to a LazyFrame (rules fuse into the caller's plan)."""
         if not self.enabled:
-            return df
+            return lf
             
         rules = self.config.get("rules", {}).get(table_name, {})
         if not rules:
-            return df
+            return lf
             
         print(f"   [Chaos] Injecting anomalies into {table_name}...")
         
         # 1. Row Duplication
         dup_rate = rules.get("duplication_rate", 0.0)
         if dup_rate > 0:
-            df = self._inject_duplicates(df, dup_rate)
+            lf = self._inject_duplicates(lf, dup_rate)
 
         # 2. Column-specific anomalies
+        schema_cols = set(lf.collect_schema().names())
         for col_name, anomalies in rules.get("columns", {}).items():
-            if col_name not in df.columns:
+            if col_name not in schema_cols:
                 continue
                 
             for anomaly_type, params in anomalies.items():
                 if anomaly_type == "nulls":
-                    df = self._inject_nulls(df, col_name, params)
+                    lf = self._inject_nulls(lf, col_name, params)
                 elif anomaly_type == "outliers":
-                    df = self._inject_outliers(df, col_name, params)
+                    lf = self._inject_outliers(lf, col_name, params)
                 elif anomaly_type == "text_corruption":
-                    df = self._corrupt_text(df, col_name, params)
+                    lf = self._corrupt_text(lf, col_name, params)
                 elif anomaly_type == "negatives":
-                    df = self._inject_negatives(df, col_name, params)
+                    lf = self._inject_negatives(lf, col_name, params)
                     
-        return df
+        return lf
 
-    def _inject_duplicates(self, df: pl.DataFrame, rate: float) -> pl.DataFrame:
-        n_rows = len(df)
-        n_dupes = int(n_rows * rate)
-        if n_dupes == 0:
-            return df
-            
-        # Sample rows to duplicate
-        dupe_indices = self.rng.sample(range(n_rows), n_dupes)
-        dupes = df.select(pl.all().gather(dupe_indices))
-        print(f"      -> Duplicated {n_dupes} rows")
-        return pl.concat([df, dupes])
+    def _inject_duplicates(self, lf: pl.LazyFrame, rate: float) -> pl.LazyFrame:
+        # Sample exactly int(n * rate) rows: shuffled row index below the cutoff
+        # (int(n * rate) == 0 leaves dupes empty). The count is only known at collect
+        # time, so nothing is logged here.
+        n_dupes = (pl.len() * rate).cast(pl.UInt32)
+        dupes = lf.filter(
+            pl.int_range(pl.len(), dtype=pl.UInt32).shuffle(seed=self.rng.randint(0, 2**31)) < n_dupes
+        )
+        return pl.concat([lf, dupes])
 
-    def _inject_nulls(self, df: pl.DataFrame, col: str, rate: float) -> pl.DataFrame:
+    def _hit_mask(self, rate: float) -> pl.Expr:
+        """Row mask (True ~ rate) hashed from the row index; same pattern as entropy.py."""
+        # One seed per call so each rule/column gets an independent pattern
+        salt = self.rng.randint(0, 2**31)
+        return pl.int_range(pl.len(), dtype=pl.UInt32).hash(seed=salt).mod(1000) < (rate * 1000)
+
+    def _inject_nulls(self, lf: pl.LazyFrame, col: str, rate: float) -> pl.LazyFrame:
         """Randomly sets values to null."""
-        return df.with_columns(
-            pl.when(pl.Series([self.rng.random() > rate for _ in range(len(df))]))
-            .then(pl.col(col))
-            .otherwise(None)
+        return lf.with_columns(
+            pl.when(self._hit_mask(rate))
+            .then(None)
+            .otherwise(pl.col(col))
             .alias(col)
         )
 
-    def _inject_outliers(self, df: pl.DataFrame, col: str, params: dict) -> pl.DataFrame:
+    def _inject_outliers(self, lf: pl.LazyFrame, col: str, params: dict) -> pl.LazyFrame:
         """Multiplies values by a distinct factor."""
         rate = params.get("rate", 0.01)
         factor = params.get("factor", 100.0)
         
-        return df.with_columns(
-            pl.when(pl.Series([self.rng.random() > rate for _ in range(len(df))]))
-            .then(pl.col(col))
-            .otherwise(pl.col(col) * factor)
-            .alias(col)
-        )
+        # Branchless: one multiply by a per-row scale (factor on hit, 1 otherwise)
+        scale = pl.when(self._hit_mask(rate)).then(pl.lit(factor)).otherwise(pl.lit(1.0))
+        return lf.with_columns((pl.col(col) * scale).alias(col))
 
-    def _inject_negatives(self, df: pl.DataFrame, col: str, rate: float) -> pl.DataFrame:
+    def _inject_negatives(self, lf: pl.LazyFrame, col: str, rate: float) -> pl.LazyFrame:
         """Multiplies values by -1."""
-        return df.with_columns(
-            pl.when(pl.Series([self.rng.random() > rate for _ in range(len(df))]))
-            .then(pl.col(col))
-            .otherwise(pl.col(col) * -1)
-            .alias(col)
-        )
+        sign = pl.when(self._hit_mask(rate)).then(pl.lit(-1)).otherwise(pl.lit(1))
+        return lf.with_columns((pl.col(col) * sign).alias(col))
         
-    def _corrupt_text(self, df: pl.DataFrame, col: str, rate: float) -> pl.DataFrame:
+    def _corrupt_text(self, lf: pl.LazyFrame, col: str, rate: float) -> pl.LazyFrame:
         """Adds whitespace padding or alters case."""
-        # This is expensive in Polars without a custom expression, 
-        # so we'll use a simpler mapping approach or map_elements if needed.
-        # For performance, we'll just add padding to random rows.
-        
-        def corrupt(val):
-            if val is None: return None
-            if self.rng.random() > rate: return val
-            
-            # Types of corruption
-            choice = self.rng.choice(["pad", "upper", "lower", "empty"])
-            if choice == "pad": return f"  {val} "
-            if choice == "upper": return val.upper()
-            if choice == "lower": return val.lower()
-            if choice == "empty": return ""
-            return val
+        # Native string kernels: one hash per row picks hit + variant (pad/upper/lower/empty)
+        h = pl.int_range(pl.len(), dtype=pl.UInt32).hash(seed=self.rng.randint(0, 2**31))
+        is_hit = h.mod(1000) < (rate * 1000)
+        variant = (h // 1000).mod(4)
+        c = pl.col(col)
 
-        return df.with_columns(
-            pl.col(col).map_elements(corrupt, return_dtype=pl.String).alias(col)
+        return lf.with_columns(
+            pl.when(~is_hit | c.is_null()).then(c)
+            .when(variant == 0).then(pl.lit("  ") + c + pl.lit(" "))
+            .when(variant == 1).then(c.str.to_uppercase())
+            .when(variant == 2).then(c.str.to_lowercase())
+            .otherwise(pl.lit(""))
+            .alias(col)
         )
@@ -1,6 +1,13 @@
 
 import polars as pl
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def hash_threshold(prob: float) -> Optional[pl.Expr]:
+    """UInt64 cutoff so that hash < cutoff holds with probability prob (None if prob <= 0)."""
+    if prob <= 0:
+        return None
+    return pl.lit(min(int(prob * 2**64), 2**64 - 1), dtype=pl.UInt64)
 
 
 class EntropyInjector:
@@ -19,20 +26,34 @@ class NullInjector(EntropyInjector):
     Simulates missing data entry or system errors.
     """
 
-    def apply(self, lf: pl.LazyFrame, col_name: str, probability: float = None, seed: int = 123) -> pl.LazyFrame:
-        prob = probability if probability is not None else self.config.get(
-            "null_probability", 0.01)
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        # Cutoff quantized once per profile, not per column/batch
+        self.threshold = hash_threshold(config.get("null_probability", 0.01))
 
-        if prob <= 0:
-            return lf
+    def expr(self, col_name: str, probability: float = None, seed: int = 123) -> Optional[pl.Expr]:
+        """Null-injection expression for col_name (None if disabled)."""
+        cutoff = self.threshold if probability is None else hash_threshold(probability)
+
+        if cutoff is None:
+            return None
 
-        return lf.with_columns(
-            pl.when(pl.col(col_name).hash(seed=seed).mod(1000) < (prob * 1000))
+        return (
+            pl.when(pl.col(col_name).hash(seed=seed) < cutoff)
             .then(None)
             .otherwise(pl.col(col_name))
             .alias(col_name)
         )
 
+    def build_exprs(self, columns: List[str], base_seed: int) -> List[pl.Expr]:
+        """One aliased expression per column (seed salted with the column index)."""
+        exprs = [self.expr(col, seed=base_seed + i) for i, col in enumerate(columns)]
+        return [e for e in exprs if e is not None]
+
+    def apply(self, lf: pl.LazyFrame, col_name: str, probability: float = None, seed: int = 123) -> pl.LazyFrame:
+        e = self.expr(col_name, probability, seed)
+        return lf if e is None else lf.with_columns(e)
+
 
 class OrphanInjector(EntropyInjector):
     """
@@ -40,20 +61,36 @@ class OrphanInjector(EntropyInjector):
     Modifies a FK column to point to non-existent IDs.
     """
 
-    def apply(self, lf: pl.LazyFrame, col_name: str, max_valid_id: int, probability: float = None, seed: int = 456) -> pl.LazyFrame:
-        prob = probability if probability is not None else self.config.get(
-            "orphan_probability", 0.0)
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.threshold = hash_threshold(config.get("orphan_probability", 0.0))
 
-        if prob <= 0:
-            return lf
+    def expr(self, col_name: str, max_valid_id: int, fk_dtype: pl.DataType,
+             probability: float = None, seed: int = 456) -> Optional[pl.Expr]:
+        """Orphan-injection expression for col_name (None if disabled)."""
+        cutoff = self.threshold if probability is None else hash_threshold(probability)
 
-        return lf.with_columns(
-            pl.when(pl.col(col_name).hash(seed=seed).mod(1000) < (prob * 1000))
-            .then(pl.lit(max_valid_id + 9999))  # Point to nowhere
+        if cutoff is None:
+            return None
+
+        # Literal typed like the FK column: no per-row upcast in the when/then
+        return (
+            pl.when(pl.col(col_name).hash(seed=seed) < cutoff)
+            .then(pl.lit(max_valid_id + 9999, dtype=fk_dtype))  # Point to nowhere
             .otherwise(pl.col(col_name))
             .alias(col_name)
         )
 
+    def build_exprs(self, fk_max_ids: Dict[str, int], schema: pl.Schema, base_seed: int) -> List[pl.Expr]:
+        """One aliased expression per FK column ({col: max_valid_id})."""
+        exprs = [self.expr(col, max_id, schema[col], seed=base_seed + i)
+                 for i, (col, max_id) in enumerate(fk_max_ids.items())]
+        return [e for e in exprs if e is not None]
+
+    def apply(self, lf: pl.LazyFrame, col_name: str, max_valid_id: int, probability: float = None, seed: int = 456) -> pl.LazyFrame:
+        e = self.expr(col_name, max_valid_id, lf.collect_schema()[col_name], probability, seed)
+        return lf if e is None else lf.with_columns(e)
+
 
 class StringNoiseInjector(EntropyInjector):
     """
@@ -62,48 +99,66 @@ class StringNoiseInjector(EntropyInjector):
     2. Whispers (Leading/Trailing spaces).
     """
 
-    def apply(self, lf: pl.LazyFrame, col_name: str, casing_prob: float = None, spaces_prob: float = None, seed: int = 777) -> pl.LazyFrame:
-        # Get config
-        c_prob = casing_prob if casing_prob is not None else self.config.get(
-            "string_noise", {}).get("casing_probability", 0.0)
-        s_prob = spaces_prob if spaces_prob is not None else self.config.get(
-            "string_noise", {}).get("spaces_probability", 0.0)
+    # Hit fields are 16 bits wide: cutoff = prob * 2^16
+    FIELD_SCALE = 65536
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        # Get config (quantized once to integer cutoffs)
+        noise_cfg = config.get("string_noise", {})
+        self.casing_cut = int(noise_cfg.get("casing_probability", 0.0) * self.FIELD_SCALE)
+        self.spaces_cut = int(noise_cfg.get("spaces_probability", 0.0) * self.FIELD_SCALE)
+
+    def exprs(self, col_name: str, casing_prob: float = None, spaces_prob: float = None,
+              seed: int = 777) -> Optional[Tuple[pl.Expr, pl.Expr]]:
+        """(temp hash column, noisy value) for col_name; None if no noise is configured."""
+        c_cut = self.casing_cut if casing_prob is None else int(casing_prob * self.FIELD_SCALE)
+        s_cut = self.spaces_cut if spaces_prob is None else int(spaces_prob * self.FIELD_SCALE)
+
+        if c_cut <= 0 and s_cut <= 0:
+            return None
+
+        # One 64-bit hash, bit-sliced into independent fields:
+        # [0:16) casing hit | [16:24) upper/lower | [24:40) spaces hit | [40:48) prefix/suffix
+        tmp = f"__h_{col_name}"
+        h = pl.col(tmp)
+        v = pl.col(col_name)
 
         # 1. Casing Noise
-        if c_prob > 0:
-            # Derived seed 1
-            s1 = seed
-            seed_expr = pl.col(col_name).hash(seed=s1)
-            is_hit = seed_expr.mod(1000) < (c_prob * 1000)
-            is_upper = seed_expr.mod(100) < 50
-
-            lf = lf.with_columns(
-                pl.when(is_hit & is_upper)
-                .then(pl.col(col_name).str.to_uppercase())
-                .when(is_hit & ~is_upper)
-                .then(pl.col(col_name).str.to_lowercase())
-                .otherwise(pl.col(col_name))
-                .alias(col_name)
+        if c_cut > 0:
+            case_hit = (h & 0xFFFF) < c_cut
+            case_upper = ((h // 2**16) & 0xFF) < 128
+            v = (
+                pl.when(case_hit & case_upper).then(v.str.to_uppercase())
+                .when(case_hit).then(v.str.to_lowercase())
+                .otherwise(v)
             )
 
         # 2. Spaces (Trim issues)
-        if s_prob > 0:
-            # Derived seed 2
-            s2 = seed + 111
-            seed_expr = pl.col(col_name).hash(seed=s2)
-            is_hit = seed_expr.mod(1000) < (s_prob * 1000)
-            is_prefix = seed_expr.mod(100) < 50
-
-            lf = lf.with_columns(
-                pl.when(is_hit & is_prefix)
-                .then(pl.lit(" ") + pl.col(col_name))
-                .when(is_hit & ~is_prefix)
-                .then(pl.col(col_name) + pl.lit(" "))
-                .otherwise(pl.col(col_name))
-                .alias(col_name)
+        if s_cut > 0:
+            space_hit = ((h // 2**24) & 0xFFFF) < s_cut
+            space_prefix = ((h // 2**40) & 0xFF) < 128
+            v = (
+                pl.when(space_hit & space_prefix).then(pl.lit(" ") + v)
+                .when(space_hit).then(v + pl.lit(" "))
+                .otherwise(v)
             )
 
-        return lf
+        return pl.col(col_name).hash(seed=seed).alias(tmp), v.alias(col_name)
+
+    def build_exprs(self, columns: List[str], base_seed: int) -> Tuple[List[pl.Expr], List[pl.Expr]]:
+        """(temp hash columns, noisy values) for all columns (seed salted with the column index)."""
+        pairs = [self.exprs(col, seed=base_seed + i) for i, col in enumerate(columns)]
+        pairs = [p for p in pairs if p is not None]
+        return [p[0] for p in pairs], [p[1] for p in pairs]
+
+    def apply(self, lf: pl.LazyFrame, col_name: str, casing_prob: float = None, spaces_prob: float = None, seed: int = 777) -> pl.LazyFrame:
+        pair = self.exprs(col_name, casing_prob, spaces_prob, seed)
+        if pair is None:
+            return lf
+        hash_e, value_e = pair
+        # Single rewrite of the string column (one pass over the buffer)
+        return lf.with_columns(hash_e).with_columns(value_e).drop(hash_e.meta.output_name())
 
 
 class EntropyManager:
@@ -132,26 +187,48 @@ class EntropyManager:
         self.orphan_injector = OrphanInjector(self.profile)
         self.string_injector = StringNoiseInjector(self.profile)
 
+    # Seed offsets per injector kind (columns salt on top of these)
+    NULL_SEED_OFFSET = 1000
+    ORPHAN_SEED_OFFSET = 2000
+    STRING_SEED_OFFSET = 3000
+
+    def inject(self, lf: pl.LazyFrame, nulls: List[str] = (), orphans: Dict[str, int] = None,
+               string_noise: List[str] = ()) -> pl.LazyFrame:
+        """
+        Apply several injections in one projection: a single with_columns whose
+        per-column expressions Polars evaluates in parallel.
+        String noise adds its temp hash columns first and drops them after.
+        """
+        hash_exprs, string_exprs = self.string_injector.build_exprs(
+            list(string_noise), self.base_seed + self.STRING_SEED_OFFSET)
+        exprs = self.null_injector.build_exprs(list(nulls), self.base_seed + self.NULL_SEED_OFFSET)
+        if orphans:
+            exprs += self.orphan_injector.build_exprs(
+                orphans, lf.collect_schema(), self.base_seed + self.ORPHAN_SEED_OFFSET)
+        exprs += string_exprs
+
+        if not exprs:
+            return lf
+
+        names = [e.meta.output_name() for e in exprs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Each column accepts one injection per call: {names}")
+
+        if hash_exprs:
+            lf = lf.with_columns(hash_exprs)
+        lf = lf.with_columns(exprs)
+        if hash_exprs:
+            lf = lf.drop([e.meta.output_name() for e in hash_exprs])
+        return lf
+
     def inject_nulls(self, lf: pl.LazyFrame, columns: List[str]) -> pl.LazyFrame:
         """Apply null injection to a list of columns."""
-        res = lf
-        for i, col in enumerate(columns):
-            # Salt the seed with column index to differ per column
-            s = self.base_seed + 1000 + i
-            res = self.null_injector.apply(res, col, seed=s)
-        return res
+        return self.inject(lf, nulls=columns)
 
     def inject_orphans(self, lf: pl.LazyFrame, fk_col: str, max_id: int) -> pl.LazyFrame:
         """Apply orphan injection to a FK column."""
-        # Derived seed
-        s = self.base_seed + 2000
-        return self.orphan_injector.apply(lf, fk_col, max_id, seed=s)
+        return self.inject(lf, orphans={fk_col: max_id})
 
     def inject_string_noise(self, lf: pl.LazyFrame, columns: List[str]) -> pl.LazyFrame:
         """Apply casing/spacing noise to text columns."""
-        res = lf
-        for i, col in enumerate(columns):
-            # Derived seed
-            s = self.base_seed + 3000 + i
-            res = self.string_injector.apply(res, col, seed=s)
-        return res
+        return self.inject(lf, string_noise=columns)
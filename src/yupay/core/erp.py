@@ -24,21 +24,11 @@ class ERPDataset(BaseDataset):
         Generates catalogs/dimensions only.
         """
         print("   -> Generando Dimensiones (Catalogs)...")
-        # Reuse SalesDataset and InventoryDataset but extract only catalogs
-        # This is a bit duplicative but keeps causality.
+        # Catalog-only hooks: no orders/payments/stock_movements plans are built
         sales_ds = SalesDataset()
         inv_ds = InventoryDataset()
 
-        # We use a dummy date range for catalogs if needed,
-        # but build() returns everything. We'll filter.
-        sales_data = sales_ds.build(config)
-        inv_data = inv_ds.build(config)
-
-        return {
-            "customers": sales_data["customers"],
-            "products": sales_data["products"],
-            "suppliers": inv_data["suppliers"]
-        }
+        return {**sales_ds.build_catalogs(config), **inv_ds.build_catalogs(config)}
 
     def build_batch(self, config: Dict[str, Any], start_date: str = None, end_date: str = None) -> Dict[str, pl.LazyFrame]:
         """
@@ -17,48 +17,23 @@ class SizeEstimator:
         self.config = config
         self.defaults = defaults
 
-    def validate_and_estimate(self, domain: str = "sales") -> Dict[str, Any]:
+        # Constants resolved once (validate_and_estimate may run per batch)
+        system = defaults["system"]
+        self.max_days = system["max_days_hard_limit"]
+        self.effective_cap = min(system["max_daily_volume_cap"],
+                                 config.get("max_daily_volume_limit", system["max_daily_volume_cap"]))
+        self.safety_buffer_gb = system["safety_buffer_gb"]
+        self.user_max_gb = config.get("max_disk_usage_gb", 10)
+        self._bytes_per_trx: Dict[str, float] = {}
+
+    def bytes_per_trx(self, domain: str = "sales") -> float:
         """
-        Runs validation checks and returns estimation details.
-        Raises ValueError if hard limits are exceeded.
-        Raises EnvironmentError if disk space is insufficient.
+        Approximate bytes per transaction for a domain (memoized per instance).
         """
-        # 1. Parse Dates and Duration
-        start_date = datetime.strptime(
-            str(self.config["start_date"]), "%Y-%m-%d")
-        end_date = datetime.strptime(str(self.config["end_date"]), "%Y-%m-%d")
+        cached = self._bytes_per_trx.get(domain)
+        if cached is not None:
+            return cached
 
-        if end_date < start_date:
-            raise ValueError(
-                f"End date ({end_date}) cannot be before start date ({start_date})")
-
-        days = (end_date - start_date).days + 1
-        max_days = self.defaults["system"]["max_days_hard_limit"]
-
-        if days > max_days:
-            raise ValueError(
-                f"Requested duration {days} days exceeds the hard limit of {max_days} days. "
-                "Please reduce the date range."
-            )
-
-        # 2. Validate Volume
-        # Inventory volume is derived, so we might need a multiplier or specific config
-        # For now, we respect the global 'daily_avg_transactions' which usually drives the main volume
-        daily_volume = self.config["daily_avg_transactions"]
-        hard_cap = self.defaults["system"]["max_daily_volume_cap"]
-        user_cap = self.config.get("max_daily_volume_limit", hard_cap)
-
-        effective_cap = min(hard_cap, user_cap)
-
-        if daily_volume > effective_cap:
-            raise ValueError(
-                f"Requested daily volume {daily_volume} exceeds the limit of {effective_cap}. "
-                "Check 'max_daily_volume_limit' in main.yaml or reduce 'daily_avg_transactions'."
-            )
-
-        # 3. Estimate Size
-        # Formula: Days * DailyVol * AvgRowBytes * Factor
-        # Formula: Days * DailyVol * AvgRowBytes * Factor
         # Get column weights from defaults based on DOMAIN
         # We use 'config' because it has the merged domain defaults
         domains_config = self.config.get("domains", {})
@@ -96,6 +71,48 @@ class SizeEstimator:
             # Generic fallback or other future domains
             bytes_per_trx = 100
 
+        self._bytes_per_trx[domain] = bytes_per_trx
+        return bytes_per_trx
+
+    def validate_and_estimate(self, domain: str = "sales") -> Dict[str, Any]:
+        """
+        Runs validation checks and returns estimation details.
+        Raises ValueError if hard limits are exceeded.
+        Raises EnvironmentError if disk space is insufficient.
+        """
+        # 1. Parse Dates and Duration (ISO dates: fromisoformat, no strptime)
+        start_date = datetime.fromisoformat(str(self.config["start_date"])[:10])
+        end_date = datetime.fromisoformat(str(self.config["end_date"])[:10])
+
+        if end_date < start_date:
+            raise ValueError(
+                f"End date ({end_date}) cannot be before start date ({start_date})")
+
+        days = (end_date - start_date).days + 1
+        max_days = self.max_days
+
+        if days > max_days:
+            raise ValueError(
+                f"Requested duration {days} days exceeds the hard limit of {max_days} days. "
+                "Please reduce the date range."
+            )
+
+        # 2. Validate Volume
+        # Inventory volume is derived, so we might need a multiplier or specific config
+        # For now, we respect the global 'daily_avg_transactions' which usually drives the main volume
+        daily_volume = self.config["daily_avg_transactions"]
+        effective_cap = self.effective_cap
+
+        if daily_volume > effective_cap:
+            raise ValueError(
+                f"Requested daily volume {daily_volume} exceeds the limit of {effective_cap}. "
+                "Check 'max_daily_volume_limit' in main.yaml or reduce 'daily_avg_transactions'."
+            )
+
+        # 3. Estimate Size
+        # Formula: Days * DailyVol * AvgRowBytes * Factor
+        bytes_per_trx = self.bytes_per_trx(domain)
+
         total_rows = days * daily_volume
         estimated_bytes = total_rows * bytes_per_trx * self.UNCERTAINTY_FACTOR
         estimated_gb = estimated_bytes / (1024**3)
@@ -106,11 +123,10 @@ class SizeEstimator:
             output_path if "." in output_path else ".")
         free_gb = free / (1024**3)
 
-        needed_free_gb = estimated_gb + \
-            self.defaults["system"]["safety_buffer_gb"]
+        needed_free_gb = estimated_gb + self.safety_buffer_gb
 
         # Check against user config max usage
-        user_max_gb = self.config.get("max_disk_usage_gb", 10)
+        user_max_gb = self.user_max_gb
 
         if estimated_gb > user_max_gb:
             raise ValueError(
@@ -1,3 +1,4 @@
+import functools
 import gettext
 import os
 import locale as sys_locale
@@ -15,14 +16,14 @@ def setup_i18n(language: Optional[str] = None):
     Args:
         language: 'es' or 'en'. If None, attempts to detect system locale.
     """
-    global _current_translation
+    global _current_translation, _gettext, _
 
     # 1. Determine language
     if not language:
         # Fallback to system env or default to 'es'
         # Windows: locale.getdefaultlocale() -> ('es_ES', 'cp1252')
         try:
-            lang, _ = sys_locale.getdefaultlocale()
+            lang, _enc = sys_locale.getdefaultlocale()
             language = lang[:2] if lang else "es"
         except:
             language = "es"
@@ -46,6 +47,11 @@ def setup_i18n(language: Optional[str] = None):
         # If .mo files are missing, fallback to Null (return keys as-is)
         _current_translation = gettext.NullTranslations()
 
+    # Bind the catalog lookup once: the proxy (and late `import _`) call it directly.
+    # Memoized per catalog; re-running setup_i18n() replaces (invalidates) the cache.
+    _gettext = functools.lru_cache(maxsize=512)(_current_translation.gettext)
+    _ = _gettext
+
     # 4. Install _() globally (Optional, but convenient for some setups)
     # We prefer explicit imports, so we won't do install() automatically
     # _current_translation.install()
@@ -61,6 +67,16 @@ def get_translation_func():
     return lambda x: x  # Pass-through
 
 
+def _lazy_gettext(message: str) -> str:
+    """First call before setup_i18n(): initialize with defaults, then translate."""
+    setup_i18n()
+    return _gettext(message)
+
+
+# Active lookup (rebound by setup_i18n)
+_gettext = _lazy_gettext
+
+
 # Singleton accessor
 def _(message: str) -> str:
     """
@@ -68,7 +84,4 @@ def _(message: str) -> str:
     Usage: from yupay.core.i18n import _
     console.print(_("Hello World"))
     """
-    if _current_translation is None:
-        # Lazy init if not setup
-        setup_i18n()
-    return _current_translation.gettext(message)
+    return _gettext(message)
@@ -8,17 +8,59 @@ class Randomizer:
     Garantiza reproducibilidad mediante semillas (en la medida de lo posible con random).
     """
 
+    # Uniformes de 53 bits a partir del hash de 64 bits
+    _U53_SCALE = 1.0 / 2**53
+
     def __init__(self, seed: int = 42):
         self.seed = seed
         random.seed(seed)
+        # Cada llamada vectorizada usa una sal distinta (determinista)
+        self._draws = 0
+
+    @staticmethod
+    def uniform_from_hash(h):
+        """
+        U[0, 1) desde un hash UInt64 (Series o Expr): 53 bits altos escalados.
+        Única definición, compartida con TimeEngine.
+        """
+        return (h // 2048).cast(pl.Float64) * Randomizer._U53_SCALE
 
-    def sample_from_list(self, items: list, n: int, weights: list = None) -> pl.Series:
+    def _uniform(self, n: int) -> pl.Series:
+        """
+        n floats U[0, 1) via hash sembrado del índice de fila (vectorizado en Polars, sin numpy).
+        """
+        self._draws += 1
+        h = pl.int_range(n, dtype=pl.UInt64, eager=True).hash(
+            seed=self.seed * 1_000_003 + self._draws)
+        return self.uniform_from_hash(h)
+
+    def sample_index(self, n_items: int, n: int, weights: list = None) -> pl.Series:
+        """
+        n índices en [0, n_items) con pesos opcionales (para reutilizarlos sobre varios catálogos alineados).
+        """
+        u = self._uniform(n)
+        if weights is None:
+            return (u * n_items).cast(pl.UInt32)
+        # Inverse-CDF: búsqueda binaria de cada uniforme en los pesos acumulados
+        cum = pl.Series(weights, dtype=pl.Float64).cum_sum()
+        return (cum / cum[-1]).search_sorted(u, side="right").clip(0, n_items - 1)
+
+    def sample_from_list(self, items: list, n: int, weights: list = None, as_enum: bool = False) -> pl.Series:
         """
         Muestreo aleatorio de una lista de items con pesos opcionales.
+        as_enum: devuelve pl.Enum (códigos enteros + diccionario) en vez de copiar strings por fila.
         """
-        # random.choices realiza muestreo con reemplazo
-        sampled = random.choices(items, weights=weights, k=n)
-        return pl.Series(sampled)
+        # Muestreo con reemplazo: índices vectorizados + un solo gather sobre los items
+        idx = self.sample_index(len(items), n, weights)
+        if not as_enum:
+            return pl.Series(items).gather(idx)
+
+        # Categorías únicas en orden de aparición; si hay repetidos, remapear índice -> código
+        categories = list(dict.fromkeys(items))
+        if len(categories) != len(items):
+            code_of = {c: i for i, c in enumerate(categories)}
+            idx = pl.Series([code_of[c] for c in items], dtype=pl.UInt32).gather(idx)
+        return idx.cast(pl.UInt32).cast(pl.Enum(categories))
 
     def add_noise(self, series: pl.Series, null_rate: float = 0.0) -> pl.Series:
         """
@@ -27,19 +69,13 @@ class Randomizer:
         if null_rate <= 0:
             return series
 
-        # Generar máscara booleana usando lista de comprensión (puede ser lento en muy alta escala)
-        # pero elimina dependencia de numpy.
+        # Máscara vectorizada (True = conservar valor), sin lista Python ni numpy
         length = len(series)
-        mask = [random.random() < null_rate for _ in range(length)]
-
-        # Convertir a Series para usar en Polars
-        mask_series = pl.Series(mask)
+        keep = self._uniform(length) >= null_rate
 
-        # Usar when/then de Polars si fuera expresión, pero aquí manipulamos Series física
-        # Opción eficiente: zip_with o set_at_idx
         return series.zip_with(
-            mask_series,
-            pl.Series([None] * length, dtype=series.dtype)
+            keep,
+            pl.repeat(None, length, dtype=series.dtype, eager=True)
         )
 
     # Métodos helper para reemplazar acceso directo a rng
@@ -49,20 +85,28 @@ class Randomizer:
     def random(self) -> float:
         return random.random()
 
-    def random_index_expr(self, n_options: int, col_name: str = "index") -> pl.Expr:
+    @staticmethod
+    def hash_field_index(h: pl.Expr, offset: int, width: int, n_options: int) -> pl.Expr:
         """
-        Genera una expresión de Polars que produce un índice aleatorio entre 0 y n_options - 1.
-        Utiliza hashing determinista basado en una columna de entrada (por defecto 'index').
-        Es 'Lazy' y no materializa memoria.
+        Índice en [0, n_options) desde los bits [offset, offset + width) de un hash UInt64 ya calculado.
+        Permite derivar varias columnas de un solo hash por fila.
         """
-        # A simple pseudo-random generator using hash and modulo.
-        # We add a salt based on self.seed to vary the results.
         if n_options <= 0:
             raise ValueError("n_options must be positive")
+        field = (h // 2**offset) & (2**width - 1)
+        # Campos angostos: el producto cabe en 32 bits, se opera en UInt32 (mitad de ancho)
+        if width + n_options.bit_length() <= 32:
+            field = field.cast(pl.UInt32)
+        # fast-range sobre el campo ((x * n) >> width)
+        return (field * n_options // 2**width).cast(pl.UInt32)
 
-        return (
-            pl.col(col_name)
-            .hash(seed=self.seed)  # Use the seed for reproducibility
-            .mod(n_options)
-            .cast(pl.UInt32)
-        )
+    @staticmethod
+    def grouped_choice_expr(values: pl.Series, offsets: list, counts: list,
+                            group_code: pl.Expr, key: pl.Expr, seed: int) -> pl.Expr:
+        """
+        Por fila, un valor de `values` dentro del slice [offset, offset + count) de su grupo.
+        `values` debe estar ordenado por grupo; group_code indexa offsets/counts. Solo gathers, sin joins.
+        """
+        offset = pl.lit(pl.Series(offsets, dtype=pl.UInt64)).gather(group_code)
+        count = pl.lit(pl.Series(counts, dtype=pl.UInt64)).gather(group_code)
+        return pl.lit(values).gather(offset + key.hash(seed=seed).mod(count))
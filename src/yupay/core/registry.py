@@ -1,4 +1,4 @@
-from typing import Dict, Any, Type, Protocol
+from typing import Dict, Any, Type, Protocol, Optional
 import click
 from rich.console import Console
 from rich.status import Status
@@ -9,7 +9,9 @@ class DomainHandler(Protocol):
     Protocol that any Domain Handler must implement.
     """
 
-    def execute(self, config: Dict[str, Any], sink: Any, status: Status, console: Console) -> None:
+    def execute(self, config: Dict[str, Any], sink: Any, status: Status, console: Console,
+                shared_ctx: Optional[Dict[str, Any]] = None) -> None:
+        """shared_ctx: data loaded once by the orchestrator (e.g. 'locale') and reused across handlers."""
         pass
 
 
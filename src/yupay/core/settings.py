@@ -1,8 +1,20 @@
+import copy
+import functools
+import os
 import yaml
 import pathlib
 from typing import Any
 
 
+@functools.lru_cache(maxsize=4)
+def _cached_yaml(path: str, mtime: float) -> dict[str, Any]:
+    """
+    Parsea un YAML una sola vez por versión del archivo (clave: ruta + mtime).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
 class Settings:
     """
     Gestor de configuración centralizado.
@@ -21,7 +33,7 @@ class Settings:
 
     def load_defaults(self) -> dict[str, Any]:
         path = self.config_dir / "defaults.yaml"
-        return self._read_yaml(path)
+        return self._read_cached_yaml(path)
 
     def load_user_config(self) -> dict[str, Any]:
         """
@@ -29,9 +41,22 @@ class Settings:
         """
         path = self.config_dir / "main.yaml"
         if path.exists():
-            return self._read_yaml(path)
+            return self._read_cached_yaml(path)
         return {}
 
+    def load_locale_setting(self, default: str = "es_PE") -> str:
+        """
+        Lee solo la clave 'locale' (main.yaml > defaults.yaml) para el arranque de i18n.
+        """
+        for name in ("main.yaml", "defaults.yaml"):
+            path = self.config_dir / name
+            if not path.exists():
+                continue
+            value = _cached_yaml(str(path), os.path.getmtime(path)).get("locale")
+            if value:
+                return value
+        return default
+
     def load_locale(self, locale: str) -> dict[str, Any]:
         """
         Carga la configuración de localización (nombres, regiones, etc.)
@@ -82,6 +107,10 @@ class Settings:
         with open(path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f) or {}
 
+    def _read_cached_yaml(self, path: pathlib.Path) -> dict[str, Any]:
+        # Copia profunda: los llamadores mutan la config fusionada.
+        return copy.deepcopy(_cached_yaml(str(path), os.path.getmtime(path)))
+
     @staticmethod
     def merge_configs(base: dict, override: dict) -> dict:
         """
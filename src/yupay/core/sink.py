@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
+import queue
+import threading
+from typing import Callable, Optional
 import polars as pl
 from pathlib import Path
-from yupay.core.system import DiskGuard
+from yupay.core.system import DiskGuard, MemoryGuard
 
 
 class BaseSink(ABC):
@@ -13,6 +16,18 @@ class BaseSink(ABC):
     def __init__(self, root_path: Path, validate_disk_space: bool = True):
         self.root_path = root_path
         self.validate_disk_space = validate_disk_space
+        # Tamaño en disco de cada archivo escrito (ruta -> bytes)
+        self._written: dict[Path, int] = {}
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Total de bytes en disco escritos por este sink (evita recorrer el directorio).
+        """
+        return sum(self._written.values())
+
+    def _record_written(self, file_path: Path) -> None:
+        self._written[file_path] = file_path.stat().st_size
 
     def validate_space(self, rows: int, avg_row_bytes: int = 100) -> bool:
         """
@@ -29,3 +44,56 @@ class BaseSink(ABC):
         Escribe el LazyFrame al disco y retorna (Ruta, Cantidad de Filas).
         """
         pass
+
+
+class BackgroundWriter:
+    """
+    Escribe con un sink en un hilo aparte (doble buffer).
+    Mientras se escribe el batch N, el hilo principal genera el batch N+1;
+    polars libera el GIL durante la escritura, así que el solapamiento es real.
+    Tras cada escritura toma una lectura de MemoryGuard (memory_status): el collect
+    ocurre en este hilo, así que es aquí donde la RAM llega a su pico.
+    """
+
+    def __init__(self, sink: BaseSink, on_written: Callable[[str, Path, int], None], max_pending: int = 1):
+        self.sink = sink
+        self.on_written = on_written
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self.memory_status = "NORMAL"
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                # Ya falló: drenar la cola sin escribir para no bloquear al productor
+                continue
+            name, lazy_df, rows_estimated, part_id = item
+            try:
+                out_path, count = self.sink.write(
+                    name, lazy_df, rows_estimated, part_id=part_id)
+                self.on_written(name, out_path, count)
+                self.memory_status = MemoryGuard.snapshot().status
+            except BaseException as e:
+                self._error = e
+
+    def submit(self, name: str, lazy_df: pl.LazyFrame, rows_estimated: int, part_id: int = None):
+        """
+        Encola una escritura (bloquea si ya hay max_pending en espera).
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put((name, lazy_df, rows_estimated, part_id))
+
+    def close(self):
+        """
+        Espera a que terminen las escrituras pendientes y propaga el primer error.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
@@ -1,5 +1,12 @@
+import os
+import gc
 import shutil
+import time
+import contextlib
+from dataclasses import dataclass
+
 import click
+import psutil
 
 
 class DiskGuard:
@@ -7,17 +14,30 @@ class DiskGuard:
     Protege el sistema de llenarse el disco.
     Define umbrales de seguridad.
     """
+    # statvfs results reused for this long (seconds)
+    SAMPLE_TTL_S = 0.1
+    _free_cache = {}  # path -> (timestamp, free_bytes)
+
+    @staticmethod
+    def _free_bytes(path: str = ".") -> int:
+        now = time.monotonic()
+        hit = DiskGuard._free_cache.get(path)
+        if hit is not None and now - hit[0] < DiskGuard.SAMPLE_TTL_S:
+            return hit[1]
+        free = shutil.disk_usage(path).free
+        DiskGuard._free_cache[path] = (now, free)
+        return free
+
     @staticmethod
     def get_free_space_gb(path: str = ".") -> float:
-        total, used, free = shutil.disk_usage(path)
-        return free / (1024**3)
+        return DiskGuard._free_bytes(path) / (1024**3)
 
     @staticmethod
     def check_space(estimated_bytes: int, threshold_gb: int = 20, path: str = ".") -> bool:
         """
         Verifica si hay suficiente espacio libre (threshold + estimado).
         """
-        free_bytes = shutil.disk_usage(path).free
+        free_bytes = DiskGuard._free_bytes(path)
         needed_bytes = estimated_bytes + (threshold_gb * 1024**3)
 
         return free_bytes >= needed_bytes
@@ -30,6 +50,15 @@ class DiskGuard:
         return rows * avg_row_bytes
 
 
+@dataclass(frozen=True)
+class MemorySnapshot:
+    """Lectura coherente de memoria: todos los campos salen de la misma muestra de psutil."""
+    status: str
+    ram_pct: float
+    budget_pct: float
+    drift_gb: float
+
+
 class MemoryGuard:
     # Baseline RAM metrics
     _baseline_process_rss_gb = None
@@ -38,37 +67,108 @@ class MemoryGuard:
     _ram_total_gb = None
     _initialized = False
 
+    # psutil samples reused for this long (seconds); oneshot() pins them instead
+    SAMPLE_TTL_S = 0.1
+    _vm = None
+    _vm_ts = 0.0
+    _rss = None
+    _rss_ts = 0.0
+    _pinned = False
+    # Handle del proceso (construirlo lee /proc/<pid>/status): uno solo por proceso
+    _proc = None
+
+    # Umbral gen0 durante generación masiva (default CPython: 700)
+    GC_GEN0_BULK_THRESHOLD = 50_000
+    _saved_gc_threshold = None
+
+    @staticmethod
+    def _virtual_memory():
+        now = time.monotonic()
+        if MemoryGuard._vm is None or (not MemoryGuard._pinned and now - MemoryGuard._vm_ts >= MemoryGuard.SAMPLE_TTL_S):
+            MemoryGuard._vm = psutil.virtual_memory()
+            MemoryGuard._vm_ts = now
+        return MemoryGuard._vm
+
+    @staticmethod
+    def _rss_bytes() -> int:
+        now = time.monotonic()
+        if MemoryGuard._rss is None or (not MemoryGuard._pinned and now - MemoryGuard._rss_ts >= MemoryGuard.SAMPLE_TTL_S):
+            if MemoryGuard._proc is None:
+                MemoryGuard._proc = psutil.Process(os.getpid())
+            MemoryGuard._rss = MemoryGuard._proc.memory_info().rss
+            MemoryGuard._rss_ts = now
+        return MemoryGuard._rss
+
+    @staticmethod
+    @contextlib.contextmanager
+    def oneshot():
+        """
+        Una sola lectura (virtual_memory + RSS) compartida por todas las consultas del bloque.
+        """
+        if MemoryGuard._pinned:
+            yield
+            return
+        # Refresh (subject to the TTL), then freeze for the duration of the block
+        MemoryGuard._virtual_memory()
+        MemoryGuard._rss_bytes()
+        MemoryGuard._pinned = True
+        try:
+            yield
+        finally:
+            MemoryGuard._pinned = False
+
     @staticmethod
     def initialize_budget():
         """
         Captura el estado inicial de la RAM para definir el 'presupuesto' de Yupay.
         """
-        import psutil
-        import os
-        vm = psutil.virtual_memory()
-        proc = psutil.Process(os.getpid())
+        # Baseline always reads fresh values
+        MemoryGuard._vm = None
+        MemoryGuard._rss = None
+        MemoryGuard._proc = psutil.Process(os.getpid())
+        vm = MemoryGuard._virtual_memory()
 
         MemoryGuard._ram_total_gb = vm.total / (1024**3)
         MemoryGuard._baseline_used_pct = vm.percent
         MemoryGuard._baseline_available_gb = vm.available / (1024**3)
-        MemoryGuard._baseline_process_rss_gb = proc.memory_info().rss / (1024**3)
+        MemoryGuard._baseline_process_rss_gb = MemoryGuard._rss_bytes() / (1024**3)
         MemoryGuard._peak_rss_gb = MemoryGuard._baseline_process_rss_gb
         MemoryGuard._peak_system_pct = vm.percent
         MemoryGuard._initialized = True
 
+    @staticmethod
+    def tune_gc_for_bulk():
+        """
+        Congela el heap actual y sube el umbral gen0 para la generación masiva.
+        Idempotente; deshacer con restore_gc().
+        """
+        if MemoryGuard._saved_gc_threshold is not None:
+            return
+        gc.collect(2)
+        gc.freeze()
+        MemoryGuard._saved_gc_threshold = gc.get_threshold()
+        _t0, t1, t2 = MemoryGuard._saved_gc_threshold
+        gc.set_threshold(MemoryGuard.GC_GEN0_BULK_THRESHOLD, t1, t2)
+
+    @staticmethod
+    def restore_gc():
+        """Restaura umbrales del GC y libera los objetos congelados por tune_gc_for_bulk()."""
+        if MemoryGuard._saved_gc_threshold is None:
+            return
+        gc.set_threshold(*MemoryGuard._saved_gc_threshold)
+        gc.unfreeze()
+        MemoryGuard._saved_gc_threshold = None
+
     @staticmethod
     def get_ram_usage_pct() -> float:
-        import psutil
-        pct = psutil.virtual_memory().percent
+        pct = MemoryGuard._virtual_memory().percent
         if pct > MemoryGuard._peak_system_pct:
             MemoryGuard._peak_system_pct = pct
         return pct
 
     @staticmethod
     def get_process_rss_gb() -> float:
-        import psutil
-        import os
-        rss_gb = psutil.Process(os.getpid()).memory_info().rss / (1024**3)
+        rss_gb = MemoryGuard._rss_bytes() / (1024**3)
         # Actualizar pico propio de Yupay
         if rss_gb > MemoryGuard._peak_rss_gb:
             MemoryGuard._peak_rss_gb = rss_gb
@@ -98,8 +198,7 @@ class MemoryGuard:
         if not MemoryGuard._initialized:
             return 0.0
 
-        import psutil
-        vm = psutil.virtual_memory()
+        vm = MemoryGuard._virtual_memory()
         current_available_gb = vm.available / (1024**3)
 
         # La caída total en RAM disponible
@@ -116,9 +215,28 @@ class MemoryGuard:
         Determina el estado según presupuesto y límites globales.
         🟡 60-80% budget (Obs) | 🟠 80-90% budget (Throttle) | 🔴 > 90% budget o > 95% global
         """
-        global_usage = MemoryGuard.get_ram_usage_pct()
-        budget_usage = MemoryGuard.get_budget_usage_pct()
+        with MemoryGuard.oneshot():
+            global_usage = MemoryGuard.get_ram_usage_pct()
+            budget_usage = MemoryGuard.get_budget_usage_pct()
 
+        return MemoryGuard._classify(global_usage, budget_usage)
+
+    @staticmethod
+    def snapshot() -> MemorySnapshot:
+        """
+        Estado, RAM global, presupuesto y drift desde una sola lectura de psutil
+        (la única caché es la de SAMPLE_TTL_S en _virtual_memory/_rss_bytes).
+        """
+        with MemoryGuard.oneshot():
+            ram_pct = MemoryGuard.get_ram_usage_pct()
+            budget_pct = MemoryGuard.get_budget_usage_pct()
+            drift_gb = MemoryGuard.get_drift()
+
+        return MemorySnapshot(MemoryGuard._classify(ram_pct, budget_pct), ram_pct, budget_pct, drift_gb)
+
+    @staticmethod
+    def _classify(global_usage: float, budget_usage: float) -> str:
+        """Umbrales de get_status (RAM global % y presupuesto %)."""
         if global_usage >= 95.0:
             return "GLOBAL_HARD_STOP"
 
@@ -138,8 +256,6 @@ class MemoryGuard:
         """
         Si el presupuesto está en WARNING o superior, intenta liberar y esperar.
         """
-        import gc
-        import time
         if MemoryGuard.get_budget_usage_pct() > threshold_pct:
             gc.collect()
             time.sleep(wait_seconds)
@@ -4,6 +4,52 @@ from datetime import datetime, timedelta, date
 from typing import List, Dict, Tuple, Optional, Any
 import math
 import random
+from statistics import NormalDist
+
+from yupay.core.random import Randomizer
+
+# pl.Date is physically days since 1970-01-01 (a Thursday): weekday = (epoch_day + 3) % 7
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# Above this lambda the Poisson quantile uses a Cornish-Fisher normal approximation
+POISSON_EXACT_MAX_LAMBDA = 64.0
+_STD_NORMAL = NormalDist()
+
+
+def poisson_icdf(u: float, lam: float) -> int:
+    """
+    Poisson quantile for a uniform u in [0, 1): monotone in u and lambda, so nearby
+    lambdas under the same seed give nearby counts.
+    """
+    if lam <= POISSON_EXACT_MAX_LAMBDA:
+        # Exact inversion: walk the CDF from k = 0
+        p = math.exp(-lam)
+        cdf = p
+        k = 0
+        while u > cdf and p > 0.0:
+            k += 1
+            p *= lam / k
+            cdf += p
+        return k
+
+    # Normal quantile + skewness correction (Cornish-Fisher), continuity-corrected
+    z = _STD_NORMAL.inv_cdf(u if u > 0.0 else 1e-300)
+    k = math.floor(lam + z * math.sqrt(lam) + (z * z - 1.0) / 6.0 + 0.5)
+    return k if k > 0 else 0
+
+
+def poisson_batch(lams: List[float], uniforms: Optional[List[float]] = None) -> List[int]:
+    """
+    Draws one Poisson sample per expected value, consuming exactly one uniform per draw
+    (inverse CDF), so re-runs with the same seed stay aligned day by day.
+    Pre-drawn uniforms may be passed in; otherwise the global random module is used.
+    """
+    icdf = poisson_icdf
+    if uniforms is None:
+        rand = random.random
+        return [icdf(rand(), lam) for lam in lams]
+    return [icdf(u, lam) for u, lam in zip(uniforms, lams)]
 
 
 class TimeProfile:
@@ -36,6 +82,21 @@ class TimeProfile:
         
         self.enable_payday = enable_payday
 
+        # Vectorized lookups for get_factor_array (built once)
+        self._season_s = pl.Series(self.seasonality_weights, dtype=pl.Float64)
+        self._weekly_s = pl.Series(self.weekly_weights, dtype=pl.Float64)
+        # Dense holiday LUT indexed by month * 32 + day (1.0 where no holiday)
+        lut = [1.0] * (13 * 32)
+        for (m, d), v in self.holidays.items():
+            lut[m * 32 + d] = float(v)
+        self._holiday_lut_s = pl.Series(lut, dtype=pl.Float64)
+        # Special dates keyed by proleptic ordinal (int keys hash faster than date objects)
+        self._special_by_ord = {d.toordinal(): float(v) for d, v in self.special_dates.items()}
+
+        # Constant folding in get_factor_array: flat components are not evaluated
+        self._flat_season = all(w == 1.0 for w in self.seasonality_weights)
+        self._flat_week = all(w == 1.0 for w in self.weekly_weights)
+
     def get_factor(self, current_date: datetime, start_date: datetime) -> float:
         """
         Calculates the volume factor for a specific date based on all configured components.
@@ -73,6 +134,53 @@ class TimeProfile:
 
         return max(0.1, seasonal_factor * trend_factor * weekly_factor * holiday_factor * special_factor * payday_factor)
 
+    def get_factor_array(self, dates: pl.Series, start_date: datetime) -> pl.Series:
+        """
+        Vectorized get_factor: one Polars pass over a Series of dates, returns Float64 factors.
+        """
+        d = pl.col("d")
+        epoch_day = d.to_physical()
+        month = d.dt.month()
+        day = d.dt.day()
+
+        # Components that are identically 1.0 are folded away (not evaluated)
+        # 1. Seasonality / 3. Weekly (gathers over the small weight tables)
+        seasonal = pl.lit(1.0)
+        if not self._flat_season:
+            seasonal = pl.lit(self._season_s).gather(month - 1)
+        weekly = pl.lit(1.0)
+        if not self._flat_week:
+            weekly = pl.lit(self._weekly_s).gather((epoch_day + 3) % 7)
+
+        # 2. Trend (integer day arithmetic)
+        trend = pl.lit(1.0)
+        if self.trend_slope:
+            days_elapsed = epoch_day - (start_date.toordinal() - EPOCH_ORDINAL)
+            trend = 1.0 + self.trend_slope * (days_elapsed / 30.44)
+
+        # 4. Holidays / 5. Special Dates (default 1.0)
+        holiday = pl.lit(1.0)
+        if self.holidays:
+            holiday = pl.lit(self._holiday_lut_s).gather(month.cast(pl.UInt32) * 32 + day)
+        special = pl.lit(1.0)
+        if self.special_dates:
+            special = epoch_day.replace_strict(
+                [o - EPOCH_ORDINAL for o in self._special_by_ord],
+                list(self._special_by_ord.values()),
+                default=1.0, return_dtype=pl.Float64)
+
+        # 6. Payday Effect
+        payday = pl.lit(1.0)
+        if self.enable_payday:
+            payday = (
+                pl.when(day.is_between(14, 16)).then(1.25)
+                .when(day >= 28).then(1.35)
+                .otherwise(1.0)
+            )
+
+        factor = (seasonal * trend * weekly * holiday * special * payday).clip(lower_bound=0.1)
+        return pl.DataFrame({"d": dates.cast(pl.Date)}).select(factor.alias("factor")).to_series()
+
 
 class TimeEngine:
     """
@@ -80,62 +188,63 @@ class TimeEngine:
     Replaces the old 'rows=N' logic with 'start_date' -> 'end_date' generation.
     """
 
-    def __init__(self, start_date: str, end_date: str, daily_avg: int, profile: TimeProfile = None):
-        self.start_date = datetime.strptime(str(start_date), "%Y-%m-%d")
-        self.end_date = datetime.strptime(str(end_date), "%Y-%m-%d")
+    def __init__(self, start_date: str, end_date: str, daily_avg: int, profile: TimeProfile = None,
+                 seed: Optional[int] = None):
+        # ISO dates: fromisoformat (no strptime format interpreter); midnight datetimes
+        self.start_date = datetime.fromisoformat(str(start_date))
+        self.end_date = datetime.fromisoformat(str(end_date))
         self.daily_avg = daily_avg
         self.profile = profile or TimeProfile("default")
+        # With a seed, daily draws come from hashing the date (independent of batching
+        # and of the global random state); without one, the global random module is used
+        self.seed = seed
+
+    @staticmethod
+    def macro_factor(year: int) -> float:
+        """Macro volatility (yearly economic conditions), 0.85 to 1.15, deterministic per year."""
+        return 0.85 + (((year * 13 * 997) % 31) / 31.0) * 0.30
+
+    def _day_uniforms(self, dates: pl.Series, stream: int) -> pl.Series:
+        """One U[0, 1) per date, drawn in bulk by hashing the date with the seed (per stream)."""
+        return Randomizer.uniform_from_hash(dates.hash(seed=self.seed * 1_000_003 + stream))
 
     def generate_timeline(self) -> pl.DataFrame:
         """
-        Generates a DataFrame with one row per day and the target transaction count for that day.
+        Generates a DataFrame with one row per day (pl.Date) and the target transaction count for that day.
         """
-        days = (self.end_date - self.start_date).days + 1
-        date_range = [self.start_date + timedelta(days=i) for i in range(days)]
-
-        counts = []
-        dates = []
-
-        # Poisson helper
-        def poisson_sample(lambda_):
-            if lambda_ < 30:
-                L = math.exp(-lambda_)
-                k = 0
-                p = 1.0
-                while p > L:
-                    k += 1
-                    p *= random.random()
-                return k - 1
-            else:
-                return max(0, int(random.normalvariate(lambda_, math.sqrt(lambda_))))
-
-        for d in date_range:
-            # 1. Base Composite Factor (Seasonality + Trend + Weekly + Holiday + Payday)
-            composite_factor = self.profile.get_factor(d, self.start_date)
-
-            # 2. Macro Volatility (Yearly Economic Conditions) - 0.85 to 1.15
-            year_seed = d.year * 13
-            # Deterministic but pseudo-random per year
-            macro_rnd = ((year_seed * 997) % 31) / 31.0
-            macro_factor = 0.85 + (macro_rnd * 0.30)
-            
-            # 3. Pure Randomness/Chaos (Daily Jitter) 0.8-1.2
-            jitter = 0.8 + (random.random() * 0.4)
-
-            # Final Expected Volume
-            expected_vol = self.daily_avg * composite_factor * macro_factor * jitter
-
-            daily_count = poisson_sample(expected_vol)
-
-            # Ensure at least 0
-            counts.append(max(0, daily_count))
-            dates.append(d)
-
-        return pl.DataFrame({
-            "date": dates,
-            "target_rows": counts,
-            "day_of_week": [d.weekday() for d in dates]
-        })
+        # Native day skeleton (no Python date objects)
+        dates = pl.date_range(self.start_date.date(), self.end_date.date(), interval="1d", eager=True)
+        days = dates.len()
+
+        # 3. Pure Randomness/Chaos (Daily Jitter) 0.8-1.2, drawn in bulk
+        if self.seed is None:
+            rand = random.random
+            jitter = pl.Series([0.8 + rand() * 0.4 for _ in range(days)], dtype=pl.Float64)
+            poisson_u = None
+        else:
+            jitter = 0.8 + self._day_uniforms(dates, 0) * 0.4
+            poisson_u = self._day_uniforms(dates, 1).to_list()
+
+        # 2. Macro factor only depends on the year: one value per year, gathered per day
+        y0 = self.start_date.year
+        macro_lut = pl.Series(
+            [self.macro_factor(y) for y in range(y0, self.end_date.year + 1)], dtype=pl.Float64)
+
+        timeline = pl.DataFrame({"date": dates}).with_columns(
+            # 1. Base Composite Factor (Seasonality + Trend + Weekly + Holiday + Payday), vectorized
+            factor=self.profile.get_factor_array(dates, self.start_date),
+            macro=pl.lit(macro_lut).gather(pl.col("date").dt.year() - y0),
+            day_of_week=((pl.col("date").to_physical() + 3) % 7).cast(pl.Int8),
+        )
+
+        # Final Expected Volume (all days), then one batched Poisson pass
+        lams = (timeline["factor"] * timeline["macro"] * jitter * self.daily_avg).to_list()
+
+        return timeline.select(
+            "date",
+            pl.Series("target_rows", poisson_batch(lams, poisson_u), dtype=pl.Int64),
+            "day_of_week",
+        )
 
     def expand_events(self, timeline_df: pl.DataFrame) -> pl.LazyFrame:
         """
@@ -143,12 +252,73 @@ class TimeEngine:
         Critically: This replaces simple "row generation".
         Each row here is a potential "order" slot.
         """
-        return (
-            timeline_df.lazy()
-            .select(
-                pl.col("date").repeat_by(
-                    "target_rows").explode().alias("event_date")
-            )
-            # Safety cleanup for 0 rows days
-            .filter(pl.col("event_date").is_not_null())
+        # Flat event index mapped to its day by binary search over the cumulative counts
+        # (no List<Date> intermediate; 0-row days are skipped naturally)
+        ends = timeline_df["target_rows"].cum_sum()
+        total = int(ends[-1]) if len(ends) else 0
+        return pl.LazyFrame().select(
+            pl.lit(timeline_df["date"]).gather(
+                pl.lit(ends).search_sorted(pl.int_range(0, total, dtype=ends.dtype), side="right")
+            ).alias("event_date")
         )
+
+    # --- Batch/range helpers (no instance state) ---
+
+    @staticmethod
+    def batch_days(daily_avg: int, target_rows: int = 5_000_000) -> int:
+        """Días necesarios para alcanzar target_rows (al menos 1)."""
+        return max(1, target_rows // max(1, daily_avg))
+
+    @staticmethod
+    def random_dates(start_date: str, end_date: str, n: int) -> pl.Series:
+        """
+        Genera fechas aleatorias dentro un rango.
+        """
+        start = datetime.fromisoformat(str(start_date))
+        end = datetime.fromisoformat(str(end_date))
+
+        # Usar timestamps para aleatoriedad
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        span = end_ts - start_ts
+
+        # Generación eficiente con list comprehension de Python
+        # Para < 10M filas, esto es suficientemente rápido y evita cargar numpy (~200MB RAM)
+        random_ts = [start_ts + (random.random() * span) for _ in range(n)]
+
+        # Polars maneja la conversión de float/int a Datetime eficientemente
+        # Cast a Datetime (usando microsegundos por defecto si es float)
+        return pl.Series("date", random_ts).cast(pl.Datetime("ms"))
+
+    @staticmethod
+    def split_date_range(start_date: str, end_date: str, daily_avg: int, target_rows: int = 5_000_000) -> list[tuple[str, str]]:
+        """
+        Divide un rango de fechas en bloques basados en el volumen estimado.
+        """
+        start = date.fromisoformat(str(start_date))
+        end = date.fromisoformat(str(end_date))
+
+        days_per_batch = TimeEngine.batch_days(daily_avg, target_rows)
+        total_days = (end - start).days + 1
+
+        # Los cortes son una progresión aritmética: sin bucle acumulativo
+        step = timedelta(days=days_per_batch - 1)
+        return [
+            (s.isoformat(), min(s + step, end).isoformat())
+            for s in (start + timedelta(days=i) for i in range(0, total_days, days_per_batch))
+        ]
+
+    @staticmethod
+    def get_next_batch_window(current_start_date: str, end_date: str, daily_avg: int, target_rows: int = 5_000_000) -> tuple[str, str]:
+        """
+        Calcula la ventana de tiempo para el siguiente batch basado en target_rows.
+        Retorna (batch_start, batch_end).
+        """
+        start = date.fromisoformat(str(current_start_date))
+        limit = date.fromisoformat(str(end_date))
+
+        days_per_batch = TimeEngine.batch_days(daily_avg, target_rows)
+
+        batch_end = min(start + timedelta(days=days_per_batch - 1), limit)
+
+        return start.isoformat(), batch_end.isoformat()
@@ -1,6 +1,22 @@
 import polars as pl
 from yupay.core.generator import BaseGenerator
 from yupay.core.random import Randomizer
+from yupay.core.chaos import ChaosEngine
+
+
+# Expresiones fijas (construidas una vez por proceso, no en cada generate)
+# Phone Number determinístico y rápido en Polars puramente
+_PHONE_EXPR = (
+    pl.lit("9") +
+    pl.col("customer_id").hash(42).mod(90000000).add(10000000).cast(pl.String)
+).alias("phone_number")
+
+# Email basado en nombres (un solo concat_str, sin temporales intermedios)
+_EMAIL_EXPR = pl.concat_str([
+    pl.col("first_name_lc"), pl.lit("."),
+    pl.col("last_name_lc"), pl.lit("@"),
+    pl.col("email_domain")
+]).alias("email")
 
 
 class CustomerGenerator(BaseGenerator):
@@ -9,18 +25,21 @@ class CustomerGenerator(BaseGenerator):
     Usa catálogos para nombres realistas.
     """
 
-    def generate(self, rows: int, stores_df: pl.DataFrame = None) -> pl.LazyFrame:
+    def __init__(self, config: dict, ctx: dict = None):
+        super().__init__(config)
+        # Contexto compartido entre llamadas (ej. batches): catálogos ya preparados
+        self.ctx = ctx if ctx is not None else {}
+
+    @staticmethod
+    def build_name_catalog(config: dict) -> dict:
         """
-        Genera clientes usando catálogos y probabilidades.
-        Args:
-            rows: Cantidad de clientes.
-            stores_df: DataFrame (Eager) con la dimensión de tiendas para asignar preferencias.
+        Listas de nombres (originales y en minúsculas) a partir de la config; se preparan una sola vez.
         """
-        rnd = Randomizer(seed=self.config.get("seed", 42))
-
-        names_cfg = self.config.get("names_catalog", {})
-        first_names = names_cfg.get("first_names", {}).get(
-            "male", []) + names_cfg.get("first_names", {}).get("female", [])
+        names_cfg = config.get("names_catalog", {})
+        first_names = names_cfg.get("first_names_flat")
+        if first_names is None:
+            first_names = names_cfg.get("first_names", {}).get(
+                "male", []) + names_cfg.get("first_names", {}).get("female", [])
         last_names = names_cfg.get("last_names", [])
 
         if not first_names:
@@ -29,13 +48,34 @@ class CustomerGenerator(BaseGenerator):
             last_names = ["Quispe", "Garcia",
                           "Rodriguez", "Flores"]  # Fallback
 
+        return {
+            "first_names": pl.Series(first_names),
+            "last_names": pl.Series(last_names),
+            "first_names_lc": pl.Series([s.lower() for s in first_names]),
+            "last_names_lc": pl.Series([s.lower() for s in last_names]),
+        }
+
+    def generate(self, rows: int, stores_df: pl.DataFrame = None) -> pl.LazyFrame:
+        """
+        Genera clientes usando catálogos y probabilidades.
+        Args:
+            rows: Cantidad de clientes.
+            stores_df: DataFrame (Eager) con al menos (city, store_id) de la dimensión de tiendas para asignar preferencias,
+                ya ordenado por (city, store_id) (lo hace SalesHandler una sola vez).
+        """
+        rnd = Randomizer(seed=self.config.get("seed", 42))
+
+        names = self.ctx.get("names")
+        if names is None:
+            names = self.ctx["names"] = self.build_name_catalog(self.config)
+
         email_domains = self.config.get("email_domains", ["gmail.com"])
         email_weights = self.config.get("email_weights", None)
 
         # Cities Strategy: If stores provided, respect their cities distribution or just plain list
         if stores_df is not None:
              # Extract unique cities from stores to ensure alignment
-            available_cities = stores_df["city"].unique().to_list()
+            available_cities = stores_df["city"].unique(maintain_order=True).to_list()
             # We could weight by number of stores per city, but for now uniform or config based
             cities = self.config.get("cities", available_cities)
             # Ensure intersection
@@ -46,69 +86,59 @@ class CustomerGenerator(BaseGenerator):
             cities = self.config.get(
                 "cities", ["Lima", "Arequipa", "Trujillo", "Cusco", "Piura"])
 
-        df = pl.DataFrame({
+        # Índices muestreados una vez y aplicados al catálogo original y al ya en minúsculas
+        # (lowercase sobre <1000 entradas en vez de sobre N filas)
+        first_idx = rnd.sample_index(len(names["first_names"]), rows)
+        last_idx = rnd.sample_index(len(names["last_names"]), rows)
+
+        # Plan lazy desde el inicio: las columnas muestreadas son la única materialización
+        df = pl.LazyFrame({
             "customer_id": pl.int_range(0, rows, dtype=pl.UInt32, eager=True),
-            "first_name": rnd.sample_from_list(first_names, rows),
-            "last_name": rnd.sample_from_list(last_names, rows),
-            "email_domain": rnd.sample_from_list(email_domains, rows, weights=email_weights),
-            "city": rnd.sample_from_list(cities, rows)
+            "first_name": names["first_names"].gather(first_idx),
+            "last_name": names["last_names"].gather(last_idx),
+            "first_name_lc": names["first_names_lc"].gather(first_idx),
+            "last_name_lc": names["last_names_lc"].gather(last_idx),
+            # Catálogos pequeños como Enum: códigos enteros en vez de strings por fila
+            "email_domain": rnd.sample_from_list(email_domains, rows, weights=email_weights, as_enum=True),
+            "city": rnd.sample_from_list(cities, rows, as_enum=True)
         })
 
-        # Generar Phone Number determinístico y rápido en Polars puramente
-        df = df.with_columns(
-            phone_number=pl.lit("9") +
-            pl.col("customer_id").hash(42).mod(
-                90000000).add(10000000).cast(pl.String)
-        )
-
-        # Generar email basado en nombres
-        df = df.with_columns(
-            email=(pl.col("first_name").str.to_lowercase() + "." +
-                   pl.col("last_name").str.to_lowercase() + "@" +
-                   pl.col("email_domain"))
-        ).drop("email_domain")
+        # Phone y email son independientes: un solo with_columns (Polars los evalúa en paralelo)
+        df = df.with_columns(_PHONE_EXPR, _EMAIL_EXPR).drop(["email_domain", "first_name_lc", "last_name_lc"])
 
         # Assign Preferred Store
         if stores_df is not None:
             # Logic: Match customer city to a store in that city
-            # We assign weighted by store count in city?
-            # Simple approach: Join locally to assign "preferred_store_id"
-            
-            # 1. Rank stores per city: 0..N
-            stores_ranked = stores_df.with_columns([
-                pl.col("store_id").cum_count().over("city").cast(pl.UInt32).alias("store_idx_in_city"),
-                pl.count("store_id").over("city").cast(pl.UInt32).alias("city_store_count")
-            ])
-            
-            # 2. Add 'city_store_count' to customers (Join on City)
-            # We extract unique counts per city
-            city_counts = stores_ranked.select(["city", "city_store_count"]).unique()
-            df = df.join(city_counts, on="city", how="left")
-            
-            # 3. Generate Random Index [0, count)
+            # stores_df llega ordenado por (city, store_id): each city is a contiguous slice [offset, offset + count)
+            city_stats = (
+                stores_df.with_row_index("offset")
+                .group_by("city", maintain_order=True)
+                .agg(pl.col("offset").first(), pl.len())
+            )
+            city_to_offset = dict(zip(city_stats["city"], city_stats["offset"]))
+            city_to_count = dict(zip(city_stats["city"], city_stats["len"]))
+
+            # Random store inside the city's slice; city is an Enum, so its integer code
+            # indexes offsets/counts directly (no string hashing, no joins)
+            city_cats = list(dict.fromkeys(cities))
             df = df.with_columns(
-                (pl.col("customer_id").hash(999).mod(pl.col("city_store_count"))).alias("target_store_idx")
+                Randomizer.grouped_choice_expr(
+                    stores_df["store_id"],
+                    offsets=[city_to_offset[c] for c in city_cats],
+                    counts=[city_to_count[c] for c in city_cats],
+                    group_code=pl.col("city").to_physical(),
+                    key=pl.col("customer_id"),
+                    seed=999,
+                ).alias("preferred_store_id")
             )
-            
-            # 4. Join back to get StoreID
-            target_stores = stores_ranked.select(["city", "store_idx_in_city", "store_id"])
-            
-            # Lazy join logic (Store assignment)
-            if isinstance(target_stores, pl.LazyFrame):
-                 target_stores = target_stores.collect()
-
-            df = df.join(
-                target_stores, 
-                left_on=["city", "target_store_idx"], 
-                right_on=["city", "store_idx_in_city"], 
-                how="left"
-            ).rename({"store_id": "preferred_store_id"}).drop(["city_store_count", "target_store_idx"])
-
-        # Chaos Injection
-        from yupay.core.chaos import ChaosEngine
+
+        # El Enum de city es solo interno (códigos para el gather): la salida mantiene String
+        df = df.with_columns(pl.col("city").cast(pl.String))
+
+        # Chaos Injection (skipped entirely when there are no rules for customers)
+        if not ChaosEngine.is_active(self.config, "customers"):
+            return df
         chaos = ChaosEngine(self.config)
-        
-        # Apply chaos (df is already Eager)
-        df_eager = chaos.apply(df, "customers")
-        
-        return df_eager.lazy()
+
+        # Apply chaos (lazy: rules join the downstream plan)
+        return chaos.apply(df, "customers")
@@ -1,17 +1,19 @@
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from datetime import date
 from rich.console import Console
 from rich.status import Status
 
 from yupay.core.registry import DomainRegistry, DomainHandler
 from yupay.core.system import MemoryGuard
-from yupay.core.time import TimeEngine
+from yupay.core.sink import BackgroundWriter
+from yupay.core.temporal import TimeEngine
 from yupay.core.erp import ERPDataset
 from yupay.domains.sales.stores import StoreGenerator  # New Import
 
 @DomainRegistry.register("sales")
 class SalesHandler:
-    def execute(self, config: Dict[str, Any], sink: Any, status: Status, console: Console) -> List[tuple]:
+    def execute(self, config: Dict[str, Any], sink: Any, status: Status, console: Console,
+                shared_ctx: Optional[Dict[str, Any]] = None) -> List[tuple]:
         """
         Executes the Sales domain generation logic.
         """
@@ -23,11 +25,19 @@ class SalesHandler:
         full_config = config
         results = []
 
-        # 1. Config Context
-        from yupay.core.settings import Settings
-        settings = Settings()
+        # 1. Config Context (locale loaded by the orchestrator when available)
+        locale_data = shared_ctx.get("locale") if shared_ctx is not None else None
+        if locale_data is None:
+            from yupay.core.settings import Settings
+            locale_data = Settings().load_locale(full_config.get("locale", "es_PE"))
+            if shared_ctx is not None:
+                shared_ctx["locale"] = locale_data
 
-        locale_data = settings.load_locale(full_config.get("locale", "es_PE"))
+        # Flat first-name list built once per locale load (generators read it as-is)
+        names = locale_data.get("names")
+        if names and "first_names_flat" not in names:
+            first = names.get("first_names", {})
+            names["first_names_flat"] = first.get("male", []) + first.get("female", [])
         if "entities" in full_config and "customers" in full_config["entities"]:
             full_config["entities"]["customers"]["names_catalog"] = locale_data.get(
                 "names", {})
@@ -38,8 +48,8 @@ class SalesHandler:
             }
 
         # 2. Decision: Batching or Monolithic?
-        start = datetime.strptime(full_config["start_date"], "%Y-%m-%d")
-        end = datetime.strptime(full_config["end_date"], "%Y-%m-%d")
+        start = date.fromisoformat(str(full_config["start_date"]))
+        end = date.fromisoformat(str(full_config["end_date"]))
         days = (end - start).days + 1
         daily = full_config["daily_avg_transactions"]
         total_trans_est = days * daily
@@ -52,11 +62,17 @@ class SalesHandler:
         # We need Eager DF for passing to Customers/Orders
         # Default 50 stores or config
         n_stores = full_config.get("domains", {}).get("sales", {}).get("stores_count", 50)
-        stores_lazy = store_gen.generate(n_stores)
-        stores_df = stores_lazy.collect()
+        # Collected once: the written table and the frame handed to generators are the same data
+        stores_raw = store_gen.generate(n_stores).collect()
+        # Generators only need (city, store_id): slim projection, sorted by city once so
+        # per-city offsets downstream work on contiguous partitions
+        stores_df = stores_raw.select(["city", "store_id"]).sort(["city", "store_id"])
+
+        # Shared across every dataset.build call (batches reuse catalogs instead of regenerating them)
+        ctx: Dict[str, Any] = {}
         
         # Write Stores
-        out_path, real_count = sink.write("stores", stores_lazy, n_stores)
+        out_path, real_count = sink.write("stores", stores_raw.lazy(), n_stores)
         results.append(("stores", real_count, out_path.name))
 
         # 4. Paso 1: Dimensiones (Customers, Products) & Paso 2: Transacciones
@@ -73,13 +89,12 @@ class SalesHandler:
             # In original code, ERPDataset.build_dimensions was used. 
             # Now we use SalesDataset specific build.
             
-            tables_map = dataset.build(full_config, stores_df=stores_df)
+            tables_map = dataset.build(full_config, stores_df=stores_df, ctx=ctx)
             
             for table_name, lf in tables_map.items():
-                budget = MemoryGuard.get_budget_usage_pct()
-                sys_ram = MemoryGuard.get_ram_usage_pct()
+                snap = MemoryGuard.snapshot()
                 status.update(
-                    f"[bold green]Simulando transacciones Monolíticas... [blue]RAM Budget: {budget:.1f}%[/blue] | [dim]SYS: {sys_ram:.1f}%[/dim][/bold green]")
+                    f"[bold green]Simulando transacciones Monolíticas... [blue]RAM Budget: {snap.budget_pct:.1f}%[/blue] | [dim]SYS: {snap.ram_pct:.1f}%[/dim][/bold green]")
                 print(f"   -> Planificando tabla (Monolítico): {table_name}")
                 
                 est = total_trans_est
@@ -104,11 +119,10 @@ class SalesHandler:
             # To avoid code duplication, we assume 'products' and 'customers' are small enough 
             # to be generated once.
             
-            # Generate ALL lazy
-            full_lazy_map = dataset.build(full_config, stores_df=stores_df)
-            
-            # Extract Dimensions
+            # Extract Dimensions (only the catalogs are planned here)
             dims = ["customers", "products"]
+            full_lazy_map = dataset.build(full_config, stores_df=stores_df, ctx=ctx, tables=dims)
+
             for d in dims:
                  if d in full_lazy_map:
                     print(f"   -> Escribiendo Dimensión: {d}")
@@ -117,58 +131,70 @@ class SalesHandler:
             
             # B. Loop for Transactions
             print(f"   -> ESCALADO DETECTADO: Usando gestión dinámica de presupuesto de RAM.")
-            current_start = full_config["start_date"]
-            end_limit = full_config["end_date"]
+            # Dates parsed once above; the loop only does integer (ordinal) day arithmetic
             target_rows = 5_000_000
+            current_ord = start.toordinal()
+            end_ord = end.toordinal()
+            days_per_batch = TimeEngine.batch_days(full_config["daily_avg_transactions"], target_rows)
             batch_idx = 0
             stable_count = 0
+            # Partitioned tables accumulate here: name -> [name, rows, file]
+            partitioned: Dict[str, list] = {}
 
-            while datetime.strptime(current_start, "%Y-%m-%d") <= datetime.strptime(end_limit, "%Y-%m-%d"):
-                # ... Memory Guard Checks ...
-                ram_status = MemoryGuard.get_status()
-                current_ram = MemoryGuard.get_ram_usage_pct()
-                budget_usage = MemoryGuard.get_budget_usage_pct()
-                
-                status.update(f"[bold green]Simulando transacciones... RAM: {budget_usage:.1f}%[/bold green]")
-                
-                if ram_status == "GLOBAL_HARD_STOP":
-                    return results
-                
-                # ... Calculation ...
-                s_date, e_date = TimeEngine.get_next_batch_window(
-                    current_start, end_limit, full_config["daily_avg_transactions"], target_rows
-                )
-
-                print(f"   -> Batch {batch_idx + 1}: [{s_date} - {e_date}]")
-
-                # Generate Batch
-                # We need to call build() with override dates
-                # AND we only want 'orders' and 'payments'
-                batch_map = dataset.build(
-                    full_config, 
-                    start_date_override=s_date, 
-                    end_date_override=e_date,
-                    stores_df=stores_df
-                )
-                
-                trans_tables = ["orders", "payments"]
-                for t in trans_tables:
-                    if t in batch_map:
-                         out_path, real_count = sink.write(
-                            t, batch_map[t], target_rows, part_id=batch_idx)
-                         
-                         # Update results logic
-                         found = False
-                         for idx, (name, count, fname) in enumerate(results):
-                            if name == t:
-                                results[idx] = (name, count + real_count, "Folder (Partitioned)")
-                                found = True
-                                break
-                         if not found:
-                            results.append((t, real_count, f"{t}/"))
-
-                current_start = (datetime.strptime(
-                    e_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-                batch_idx += 1
+            def on_written(t, out_path, real_count):
+                # Runs on the writer thread (the only one touching 'partitioned' until close())
+                entry = partitioned.get(t)
+                if entry is None:
+                    partitioned[t] = [t, real_count, f"{t}/"]
+                else:
+                    entry[1] += real_count
+                    entry[2] = "Folder (Partitioned)"
+
+            # Writes of batch N overlap with generation of batch N+1
+            writer = BackgroundWriter(sink, on_written)
+            trans_tables = ["orders", "payments"]
+
+            status_tmpl = "[bold green]Simulando transacciones... RAM: {budget:.1f}%[/bold green]"
+
+            # close() always runs: pending writes finish and a writer error is raised
+            # even if build() fails mid-loop
+            try:
+                while current_ord <= end_ord:
+                    # ... Calculation ...
+                    batch_end_ord = min(current_ord + days_per_batch - 1, end_ord)
+                    s_date = date.fromordinal(current_ord).isoformat()
+                    e_date = date.fromordinal(batch_end_ord).isoformat()
+
+                    print(f"   -> Batch {batch_idx + 1}: [{s_date} - {e_date}]")
+
+                    # Generate Batch
+                    # We need to call build() with override dates
+                    # AND we only want 'orders' and 'payments'
+                    batch_map = dataset.build(
+                        full_config, 
+                        start_date_override=s_date, 
+                        end_date_override=e_date,
+                        stores_df=stores_df,
+                        ctx=ctx,
+                        tables=trans_tables
+                    )
+
+                    # ... Memory Guard Checks (before every submit: fresh reading here plus
+                    # the writer thread's reading after its last write) ...
+                    snap = MemoryGuard.snapshot()
+                    status.update(status_tmpl.format(budget=snap.budget_pct))
+                    if "GLOBAL_HARD_STOP" in (snap.status, writer.memory_status):
+                        break
+
+                    for t in trans_tables:
+                        if t in batch_map:
+                             writer.submit(t, batch_map[t], target_rows, part_id=batch_idx)
+
+                    current_ord = batch_end_ord + 1
+                    batch_idx += 1
+            finally:
+                writer.close()
+
+            results.extend(tuple(e) for e in partitioned.values())
 
         return results
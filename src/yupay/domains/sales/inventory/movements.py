@@ -13,6 +13,16 @@ class InventoryDataset(BaseDataset):
     Orchestrates generation of Inventory data: Suppliers and Stock Movements.
     """
 
+    def build_catalogs(self, config: dict) -> dict[str, pl.LazyFrame]:
+        """
+        Suppliers only (no stock-movement plan).
+        """
+        n_suppliers = config.get("domains", {}).get(
+            "inventory", {}).get("suppliers_base", 100)
+        supp_gen = SupplierGenerator(config.get(
+            "entities", {}).get("suppliers", {}))
+        return {"suppliers": supp_gen.generate(n_suppliers)}
+
     def build(self, config: dict, rows_map: dict[str, int] = None, start_date_override: str = None, end_date_override: str = None) -> dict[str, pl.LazyFrame]:
         # 0. Config
         start_date = start_date_override or config.get(
@@ -29,52 +39,51 @@ class InventoryDataset(BaseDataset):
             "sales", {}).get("products_catalog_size", 500)
 
         # 1. Generators
-        supp_gen = SupplierGenerator(config.get(
-            "entities", {}).get("suppliers", {}))
         # We need products just to ensure we know the count for FKs, we don't necessarily need to output them again if Sales does it.
         # But for standalone Inventory generation, we might want them.
         # For now, we assume we generate the dataframe to get consistent IDs if deterministic
 
-        suppliers_lazy = supp_gen.generate(
-            n_suppliers).with_row_index("supp_idx")
+        suppliers_lazy = self.build_catalogs(config)["suppliers"].with_row_index("supp_idx")
 
         # 2. Stock Movements (Time Engine)
         rnd = Randomizer(seed=config.get("seed", 42) + 10)
-        time_eng = TimeEngine(start_date, end_date, daily_avg_movements)
+        time_eng = TimeEngine(start_date, end_date, daily_avg_movements, seed=rnd.seed)
         chaos_eng = EntropyManager(config)
 
         # Generate timeline
         movements_lf = time_eng.expand_events(time_eng.generate_timeline())
         movements_lf = movements_lf.with_row_index("mov_idx")
 
+        # One hash per row, bit-sliced into independent fields:
+        # [0:24) supplier | [24:48) product | [48:56) type | [56:64) quantity
+        movements_lf = movements_lf.with_columns(
+            pl.col("mov_idx").hash(seed=rnd.seed).alias("_h"))
+        h = pl.col("_h")
+
         movements_lf = movements_lf.with_columns([
             pl.col("mov_idx").cast(pl.UInt32).alias("movement_id"),
-            pl.col("event_date").cast(pl.Date).alias("movement_date"),
+            pl.col("event_date").alias("movement_date"),
 
             # FKs
-            rnd.random_index_expr(n_suppliers, "mov_idx").alias("supp_idx"),
-            rnd.random_index_expr(n_products, "mov_idx").alias(
+            Randomizer.hash_field_index(h, 0, 24, n_suppliers).alias("supp_idx"),
+            Randomizer.hash_field_index(h, 24, 24, n_products).alias(
                 "product_id"),  # Direct ID assumption (0 to N-1)
 
             # Attributes
             # Type: 90% Ingress (Purchase), 10% Adjustment
-            (pl.col("mov_idx").hash(11).mod(100) < 90).alias("is_ingress"),
+            pl.when(Randomizer.hash_field_index(h, 48, 8, 100) < 90)
+            .then(pl.lit("INGRESS"))
+            .otherwise(pl.lit("ADJUSTMENT")).alias("movement_type"),
 
             # Qty: Bulk quantities for ingress
-            (pl.col("mov_idx").hash(13).mod(100) *
+            (Randomizer.hash_field_index(h, 56, 8, 100) *
              5 + 10).cast(pl.UInt16).alias("quantity")
-        ])
-
-        movements_lf = movements_lf.with_columns(
-            pl.when(pl.col("is_ingress")).then(pl.lit("INGRESS"))
-            .otherwise(pl.lit("ADJUSTMENT")).alias("movement_type")
-        ).drop("is_ingress")
+        ]).drop("_h")
 
         # 3. Entropy
-        # Orphans in suppliers
-        movements_lf = chaos_eng.inject_orphans(
-            movements_lf, "supp_idx", n_suppliers)
-        movements_lf = chaos_eng.inject_nulls(movements_lf, ["movement_date"])
+        # Orphans in suppliers + null dates (one projection)
+        movements_lf = chaos_eng.inject(
+            movements_lf, nulls=["movement_date"], orphans={"supp_idx": n_suppliers})
 
         # 4. Join to resolve Supplier - Denormalized & Dirty
         # Join on supp_idx (internal) to get real attributes
@@ -33,10 +33,9 @@ class SupplierGenerator(BaseGenerator):
             "country": rnd.sample_from_list(countries, rows)
         })
 
-        # Concat name
+        # Concat name (single native kernel, no intermediate columns)
         df = df.with_columns(
-            name=(pl.col("prefix") + " " +
-                  pl.col("base") + " " + pl.col("suffix"))
+            name=pl.concat_str(["prefix", "base", "suffix"], separator=" ")
         ).drop(["prefix", "base", "suffix"])
 
         return df.lazy()
@@ -1,5 +1,5 @@
 import polars as pl
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 
 from yupay.core.dataset import BaseDataset
 from yupay.domains.sales.customers import CustomerGenerator
@@ -15,9 +15,48 @@ class SalesDataset(BaseDataset):
     Genera Clientes, Productos y Órdenes relacionadas.
     """
 
+    def build_catalogs(self, config: dict, stores_df: pl.DataFrame = None, ctx: dict = None) -> dict[str, pl.LazyFrame]:
+        """
+        Solo catálogos (customers, products): sin plan transaccional.
+        Con ctx, el resultado se memoriza ahí y se reutiliza en llamadas posteriores (batches).
+        """
+        if ctx is not None and "catalogs" in ctx:
+            return ctx["catalogs"]
+
+        n_customers = config.get("domains", {}).get(
+            "sales", {}).get("customers_base", 10000)
+        n_products = config.get("domains", {}).get(
+            "sales", {}).get("products_catalog_size", 500)
+
+        cust_config = config.get("entities", {}).get("customers", {}).copy()
+        cust_config["chaos"] = config.get("chaos", {})
+        cust_config["seed"] = config.get("chaos", {}).get("seed", 42)
+        cust_gen = CustomerGenerator(cust_config, ctx=ctx)
+
+        # Inject catalog into product config
+        prod_config = config.get("entities", {}).get("products", {}).copy()
+        prod_config["catalog"] = config.get("catalogs", {}).get("products", {})
+        prod_config["chaos"] = config.get("chaos", {})
+        prod_config["seed"] = config.get("chaos", {}).get("seed", 42)
+        prod_gen = ProductGenerator(prod_config)
+
+        catalogs = {
+            # Pass stores to customer gen if available
+            "customers": cust_gen.generate(n_customers, stores_df=stores_df),
+            "products": prod_gen.generate(n_products),
+        }
+        if ctx is not None:
+            ctx["catalogs"] = catalogs
+        return catalogs
+
     def build(self, config: dict, rows_map: dict[str, int] = None, 
               start_date_override: str = None, end_date_override: str = None,
-              stores_df: pl.DataFrame = None) -> dict[str, pl.LazyFrame]:
+              stores_df: pl.DataFrame = None, ctx: dict = None,
+              tables: list[str] = None) -> dict[str, pl.LazyFrame]:
+        """
+        Plan de customers, products, orders y payments.
+        tables: subconjunto a devolver (None = todas); sin orders/payments no se planifica la parte transaccional.
+        """
         
         # 0. Configuración Temporal y Volumetría
         start_date = start_date_override or config.get(
@@ -39,41 +78,28 @@ class SalesDataset(BaseDataset):
             "sales", {}).get("products_catalog_size", 500)
 
         # 1. Generar Catálogos
-        # 1. Generar Catálogos
-        cust_config = config.get("entities", {}).get("customers", {}).copy()
-        cust_config["chaos"] = config.get("chaos", {})
-        cust_config["seed"] = config.get("chaos", {}).get("seed", 42)
-        cust_gen = CustomerGenerator(cust_config)
+        catalogs = self.build_catalogs(config, stores_df=stores_df, ctx=ctx)
+        if tables is not None and not {"orders", "payments"} & set(tables):
+            return {t: catalogs[t] for t in tables if t in catalogs}
+        customers_lazy = catalogs["customers"].with_row_index("cust_idx")
+        products_lazy = catalogs["products"].with_row_index("prod_idx")
 
-        # Inject catalog into product config
-        prod_config = config.get("entities", {}).get("products", {}).copy()
-        prod_config["catalog"] = config.get("catalogs", {}).get("products", {})
-        prod_config["chaos"] = config.get("chaos", {})
-        prod_config["seed"] = config.get("chaos", {}).get("seed", 42)
-        prod_gen = ProductGenerator(prod_config)
-
-        # Pass stores to customer gen if available
-        customers_lazy = cust_gen.generate(
-            n_customers, stores_df=stores_df).with_row_index("cust_idx")
-            
-        products_lazy = prod_gen.generate(
-            n_products).with_row_index("prod_idx")
+        # IDs por tag como Series (un solo partition_by, sin listas Python)
+        parts = (products_lazy.select(["product_id", "seasonal_tag"]).collect()
+                 .partition_by("seasonal_tag", as_dict=True))
 
-        # collect products to buckets
-        products_pdf = products_lazy.collect()
+        def tag_ids(tag):
+            part = parts.get((tag,))
+            return None if part is None else part["product_id"].cast(pl.UInt32)
 
-        # Get IDs per tag
-        ids_summer = products_pdf.filter(pl.col("seasonal_tag") == "summer")[
-            "product_id"].to_list()
-        ids_winter = products_pdf.filter(pl.col("seasonal_tag") == "winter")[
-            "product_id"].to_list()
-        ids_allyear = products_pdf.filter(pl.col("seasonal_tag") == "all_year")[
-            "product_id"].to_list()
+        ids_summer = tag_ids("summer")
+        ids_winter = tag_ids("winter")
+        ids_allyear = tag_ids("all_year")
 
-        # Fallback if empty lists (avoid crash)
-        if not ids_summer: ids_summer = [0]
-        if not ids_winter: ids_winter = [0]
-        if not ids_allyear: ids_allyear = range(n_products)
+        # Fallback if empty (avoid crash)
+        if ids_summer is None: ids_summer = pl.Series([0], dtype=pl.UInt32)
+        if ids_winter is None: ids_winter = pl.Series([0], dtype=pl.UInt32)
+        if ids_allyear is None: ids_allyear = pl.int_range(0, n_products, dtype=pl.UInt32, eager=True)
 
         # 2. Generar Órdenes (Temporal Engine Strategy)
         # 2.1 Configurar Perfil Retail Perú
@@ -95,19 +121,26 @@ class SalesDataset(BaseDataset):
         
         
         # Dynamic Special Dates with Ramp-up
-        special_dates = {}
-        s_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
-        e_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
+        # Se acumulan por ordinal (int) y se pasan a date una sola vez al final
+        special_ord = {}
+        s_date_obj = datetime.fromisoformat(str(start_date))
+        e_date_obj = datetime.fromisoformat(str(end_date))
         
-        def add_ramp(dates_dict, target_date, days_before, start_factor, peak_factor):
-            """Generates a linear ramp-up to a target date."""
+        def add_ramp(target_date, days_before, start_factor, peak_factor):
+            """Generates a linear ramp-up to a target date (keeps the highest factor on overlap)."""
             slope = (peak_factor - start_factor) / days_before
+            first = target_date.toordinal() - days_before
             for i in range(days_before + 1):
-                day = target_date - timedelta(days=days_before - i)
                 factor = start_factor + (slope * i)
-                # Keep the highest factor if overlap
-                current = dates_dict.get(day, 0.0)
-                dates_dict[day] = max(current, factor)
+                if factor > special_ord.get(first + i, 0.0):
+                    special_ord[first + i] = factor
+
+        def add_flat(days, factor):
+            """Flat factor over days (keeps the highest factor on overlap)."""
+            for d in days:
+                o = d.toordinal()
+                if factor > special_ord.get(o, 0):
+                    special_ord[o] = factor
 
         for year in range(s_date_obj.year, e_date_obj.year + 1):
             # 1. Mother's Day: 2nd Sunday of May
@@ -117,22 +150,20 @@ class SalesDataset(BaseDataset):
             mothers_day = date(year, 5, second_sunday)
             
             # Ramp-up 7 days before (1.1x -> 3.0x)
-            add_ramp(special_dates, mothers_day, 7, 1.1, 3.0)
+            add_ramp(mothers_day, 7, 1.1, 3.0)
             
             # 2. Fiestas Patrias: July 28-29
             # Ramp-up from July 15 (Gratificaciones) -> July 28
             fpatrias = date(year, 7, 28)
-            add_ramp(special_dates, fpatrias, 13, 1.2, 2.5)
-            special_dates[date(year, 7, 29)] = 2.5 # Day 2 also high
+            add_ramp(fpatrias, 13, 1.2, 2.5)
+            special_ord[date(year, 7, 29).toordinal()] = 2.5 # Day 2 also high
             
             # 3. Cyber Days (Simulated) - 3 Days Flat High
             # Mid-July (15-17)
-            for d in [date(year, 7, 15), date(year, 7, 16), date(year, 7, 17)]:
-                 special_dates[d] = max(special_dates.get(d, 0), 1.8)
+            add_flat([date(year, 7, 15), date(year, 7, 16), date(year, 7, 17)], 1.8)
             
             # Mid-Nov (14-16)
-            for d in [date(year, 11, 14), date(year, 11, 15), date(year, 11, 16)]:
-                 special_dates[d] = max(special_dates.get(d, 0), 1.8)
+            add_flat([date(year, 11, 14), date(year, 11, 15), date(year, 11, 16)], 1.8)
 
             # 4. Christmas: Ramp-up from Nov 20 -> Dec 24
             xmas_eve = date(year, 12, 24)
@@ -140,7 +171,9 @@ class SalesDataset(BaseDataset):
             # Nov 20 (1.1x) -> Dec 24 (3.5x)
             nov_20 = date(year, 11, 20)
             days_ramp = (xmas_eve - nov_20).days
-            add_ramp(special_dates, xmas_eve, days_ramp, 1.1, 3.5)
+            add_ramp(xmas_eve, days_ramp, 1.1, 3.5)
+
+        special_dates = {date.fromordinal(o): f for o, f in special_ord.items()}
 
         retail_profile = TimeProfile(
             name="Retail Peru",
@@ -151,204 +184,153 @@ class SalesDataset(BaseDataset):
             enable_payday=True
         )
 
-        time_eng = TimeEngine(start_date, end_date, daily_avg, profile=retail_profile)
+        time_eng = TimeEngine(start_date, end_date, daily_avg, profile=retail_profile,
+                              seed=config.get("seed", 42))
         chaos_eng = EntropyManager(config)
 
         orders_lf = time_eng.expand_events(time_eng.generate_timeline())
         orders_lf = orders_lf.with_row_index("order_idx")
 
-        # 3. Lógica Estacional: Asignar Tag Target -> Asignar Product ID
+        # 3. Plan por etapas (dependencias de datos): cada etapa es un solo with_columns,
+        # así Polars evalúa en paralelo las expresiones independientes.
         VAL_TWO_PI = 6.28318530718
         VAL_PEAK_SUMMER = 45
 
-        # Generar Factores de Estacionalidad Continua
-        orders_lf = orders_lf.with_columns([
+        cutoff_vip_id = int(n_customers * 0.2)
+        # Con stores_df, customers trae preferred_store_id (flag en vez de inspeccionar el schema)
+        has_stores = stores_df is not None
+
+        # Un hash por grupo de columnas, troceado en campos de bits (hash_field_index):
+        # _h_mix  [0:16) tag roll | [16:32) pareto roll | [32:48) daily noise | [48:64) quantity
+        # _h_cust [0:24) customer idx (vip o casual) | [24:28) payment delay | [28:38) payment method
+        #         | [38:48) payment success | [48:64) price factor  (pagos reutiliza este hash)
+        # _h_store [0:16) store roll | [16:32) POS | [32:48) cashier | [48:64) random store
+        field = Randomizer.hash_field_index
+        h_mix, h_cust, h_store = pl.col("_h_mix"), pl.col("_h_cust"), pl.col("_h_store")
+        hashes = [
+            pl.col("order_idx").hash(100).alias("_h_mix"),
+            pl.col("order_idx").hash(101).alias("_h_cust"),
+        ]
+        if has_stores:
+            hashes.append(pl.col("order_idx").hash(888).alias("_h_store"))
+        orders_lf = orders_lf.with_columns(hashes)
+
+        # Quantity (50% 1, 30% 2, 10% 3, 5% 4, 5% 5): native when/then ladder, no Python per row
+        q_roll = field(h_mix, 48, 16, 100)
+        quantity = (
+            pl.when(q_roll < 50).then(pl.lit(1, dtype=pl.UInt16))
+            .when(q_roll < 80).then(pl.lit(2, dtype=pl.UInt16))
+            .when(q_roll < 90).then(pl.lit(3, dtype=pl.UInt16))
+            .when(q_roll < 95).then(pl.lit(4, dtype=pl.UInt16))
+            .otherwise(pl.lit(5, dtype=pl.UInt16))
+        )
+
+        # Etapa A: columnas crudas por fila (solo dependen de order_idx / event_date)
+        year = pl.col("event_date").dt.year().cast(pl.Int32)
+        stage_a = [
             pl.col("event_date").dt.ordinal_day().cast(pl.Int32).alias("doy"),
-            pl.col("event_date").dt.year().cast(pl.Int32).alias("year"),
-            pl.col("order_idx").hash(100).mod(1000).cast(pl.Float32).truediv(
+            year.alias("year"),
+            field(h_mix, 0, 16, 1000).cast(pl.Float32).truediv(
                 1000.0).alias("probs_rnd"),  # Roll de dado 0-1
-
-            # Base logic columns
             pl.col("order_idx").cast(pl.UInt32).alias("order_id"),
-            pl.col("event_date").cast(pl.Date).alias("order_date"),
-        ])
-
-        # Calcular Onda Estacional con "Chaos"
-        orders_lf = orders_lf.with_columns([
-            (pl.col("year").hash(2024).mod(31).cast(
-                pl.Int32) - 15).alias("yearly_shift"),
-            (pl.col("order_idx").hash(999).mod(200).cast(
-                pl.Float32).truediv(1000.0) - 0.1).alias("daily_noise")
-        ])
-
-        orders_lf = orders_lf.with_columns([
-            (pl.col("doy") + pl.col("yearly_shift") -
-             pl.lit(VAL_PEAK_SUMMER)).alias("shifted_doy")
-        ])
-
-        # Calcular Seasonal Intensity
-        orders_lf = orders_lf.with_columns([
-            (
-                (
-                    (pl.col("shifted_doy").cast(pl.Float32) /
-                     365.0 * pl.lit(VAL_TWO_PI)).cos()
-                    + 1.0
-                ) / 2.0
-                + pl.col("daily_noise")
-            ).clip(0.0, 1.0).alias("seasonal_intensity")
-        ])
-
-        # Definir Probabilidades Dinámicas
-        orders_lf = orders_lf.with_columns([
-            (0.05 + 0.65 * pl.col("seasonal_intensity")).alias("p_summer"),
-            (0.05 + 0.55 * (1.0 - pl.col("seasonal_intensity"))).alias("p_winter")
-        ])
-        
-        orders_lf = orders_lf.with_columns(
-            pl.col("event_date").dt.weekday().alias("weekday")
-        )
-
-        orders_lf = orders_lf.with_columns([
-            pl.when(pl.col("weekday") >= 6)
-            .then(pl.col("p_summer") * 1.2)
-            .otherwise(pl.col("p_summer"))
-            .clip(0.0, 1.0)
-            .alias("p_summer")
-        ])
-
-        orders_lf = orders_lf.with_columns(
-            pl.when(pl.col("probs_rnd") < pl.col(
-                "p_summer")).then(pl.lit("summer"))
-            .when(pl.col("probs_rnd") < (pl.col("p_summer") + pl.col("p_winter"))).then(pl.lit("winter"))
+            pl.col("event_date").alias("order_date"),
+            (year.hash(2024).mod(31).cast(pl.Int32) - 15).alias("yearly_shift"),
+            (field(h_mix, 32, 16, 200).cast(
+                pl.Float32).truediv(1000.0) - 0.1).alias("daily_noise"),
+            pl.col("event_date").dt.weekday().alias("weekday"),
+
+            # Customer Assignment (Pareto 80/20 Distribution): 80% of orders -> top 20% customers
+            pl.when(field(h_mix, 16, 16, 1000) < 800)
+            # (al menos 1 opción por rama: con pocos clientes cutoff_vip_id puede ser 0)
+            .then(field(h_cust, 0, 24, max(1, cutoff_vip_id)))
+            .otherwise(pl.lit(cutoff_vip_id, dtype=pl.UInt32) +
+                       field(h_cust, 0, 24, max(1, n_customers - cutoff_vip_id)))
+            .alias("cust_idx"),
+
+            quantity.alias("quantity"),
+            ((field(h_cust, 48, 16, 100).cast(
+                pl.Float32) / 1000.0) + 0.95).alias("price_factor"),
+        ]
+        if has_stores:
+            max_store_id = stores_df.height
+            stage_a += [
+                (field(h_store, 48, 16, max_store_id) + 1).alias("random_store_id"),
+            ]
+        orders_lf = orders_lf.with_columns(stage_a)
+
+        # Paso 3.2: Candidatos reales por tag (gather directo sobre la lista de IDs, sin joins)
+        def candidate(ids, offset):
+            return pl.lit(ids).gather(((pl.col("order_idx") + offset) % len(ids)).cast(pl.UInt32))
+
+        # Etapa B: derivadas (onda estacional con "chaos" -> probabilidades -> tag -> IDs)
+        shifted_doy = pl.col("doy") + pl.col("yearly_shift") - pl.lit(VAL_PEAK_SUMMER)
+
+        # Onda coseno precalculada para todo el rango posible de shifted_doy
+        # (doy 1..366, yearly_shift -15..15): gather en vez de cos() por fila
+        min_shifted = 1 - 15 - VAL_PEAK_SUMMER
+        max_shifted = 366 + 15 - VAL_PEAK_SUMMER
+        wave_lut = (
+            (pl.int_range(min_shifted, max_shifted + 1, eager=True).cast(pl.Float32)
+             / 365.0 * VAL_TWO_PI).cos()
+            + 1.0
+        ) / 2.0
+        seasonal_intensity = (
+            pl.lit(wave_lut).gather(shifted_doy - min_shifted)
+            + pl.col("daily_noise")
+        ).clip(0.0, 1.0)
+
+        # Probabilidades dinámicas (boost de fin de semana para summer)
+        p_summer = 0.05 + 0.65 * seasonal_intensity
+        p_summer = pl.when(pl.col("weekday") >= 6).then(p_summer * 1.2).otherwise(p_summer).clip(0.0, 1.0)
+        p_winter = 0.05 + 0.55 * (1.0 - seasonal_intensity)
+
+        target_tag = (
+            pl.when(pl.col("probs_rnd") < p_summer).then(pl.lit("summer"))
+            .when(pl.col("probs_rnd") < (p_summer + p_winter)).then(pl.lit("winter"))
             .otherwise(pl.lit("all_year"))
-            .alias("target_tag")
         )
 
-        # Paso 3.2: Asignar IDs reales
-        def make_lookup(ids_list, name_suffix):
-            return pl.DataFrame({
-                f"idx_{name_suffix}": pl.int_range(0, len(ids_list), dtype=pl.UInt32, eager=True),
-                f"cand_{name_suffix}": pl.Series(ids_list, dtype=pl.UInt32)
-            }).lazy()
-
-        lookup_summer = make_lookup(ids_summer, "summer")
-        lookup_winter = make_lookup(ids_winter, "winter")
-        lookup_allyear = make_lookup(ids_allyear, "allyear")
-
-        len_summer = len(ids_summer)
-        len_winter = len(ids_winter)
-        len_allyear = len(ids_allyear)
-
         orders_lf = orders_lf.with_columns([
-            (pl.col("order_idx") % len_summer).cast(pl.UInt32).alias("idx_summer"),
-            ((pl.col("order_idx") + 1) % len_winter).cast(pl.UInt32).alias("idx_winter"),
-            ((pl.col("order_idx") + 2) % len_allyear).cast(pl.UInt32).alias("idx_allyear"),
+            pl.when(target_tag == "summer").then(candidate(ids_summer, 0))
+            .when(target_tag == "winter").then(candidate(ids_winter, 1))
+            .otherwise(candidate(ids_allyear, 2))
+            .alias("product_id"),
         ])
 
-        orders_lf = orders_lf.join(lookup_summer, on="idx_summer", how="left")
-        orders_lf = orders_lf.join(lookup_winter, on="idx_winter", how="left")
-        orders_lf = orders_lf.join(lookup_allyear, on="idx_allyear", how="left")
-
-        orders_lf = orders_lf.with_columns(
-            pl.when(pl.col("target_tag") == "summer").then(pl.col("cand_summer"))
-            .when(pl.col("target_tag") == "winter").then(pl.col("cand_winter"))
-            .otherwise(pl.col("cand_allyear"))
-            .alias("product_id")
-        )
-
-        orders_lf = orders_lf.drop(["idx_summer", "idx_winter", "idx_allyear",
-                                    "cand_summer", "cand_winter", "cand_allyear"])
-
-        # 3.3 Customer Assignment (Pareto 80/20 Distribution)
-        cutoff_vip_id = int(n_customers * 0.2)
-
-        orders_lf = orders_lf.with_columns([
-            pl.col("order_idx").hash(777).mod(1000).cast(
-                pl.Float32).truediv(1000.0).alias("pareto_rnd"),
-            (pl.col("order_idx").hash(101).mod(
-                cutoff_vip_id).cast(pl.UInt32)).alias("idx_vip"),
-            (pl.lit(cutoff_vip_id) + pl.col("order_idx").hash(202).mod(n_customers -
-             cutoff_vip_id).cast(pl.UInt32)).alias("idx_casual")
-        ])
-
-        orders_lf = orders_lf.with_columns(
-            pl.when(pl.col("pareto_rnd") < 0.80)
-            .then(pl.col("idx_vip"))
-            .otherwise(pl.col("idx_casual"))
-            .alias("cust_idx")
-        )
-
-        # Quantity
-        orders_lf = orders_lf.with_columns(
-            (pl.col("order_idx").hash(21).mod(100).map_elements(
-                lambda x: 1 if x < 50 else (2 if x < 80 else (
-                    3 if x < 90 else (4 if x < 95 else 5))),
-                return_dtype=pl.UInt16
-            )).alias("quantity")
-        )
+        # Solo lo que usan los joins / etapa C / pagos (sin intermedios estacionales)
+        keep = ["order_idx", "order_id", "order_date", "product_id", "cust_idx", "quantity", "price_factor",
+                "_h_cust"]
+        if has_stores:
+            keep += ["random_store_id", "_h_store"]
+        orders_lf = orders_lf.select(keep)
 
         # 4. RAW EXPORT DENORMALIZATION
-        orders_flat = orders_lf.join(products_lazy, on="product_id", how="left")
+        # El timeline ya sale ordenado por fecha: los joins conservan el orden (sin sort final)
+        orders_flat = orders_lf.join(products_lazy, on="product_id", how="left", maintain_order="left")
 
         # JOIN Customers to get preferred store
         # Note: customers_lazy has 'preferred_store_id' if stores_df was passed
-        orders_flat = orders_flat.join(customers_lazy, on="cust_idx", how="left")
-
-        # 4.1 Store Assignment Logic
-        if "preferred_store_id" in orders_flat.collect_schema().names():
-            # If we have stores, use preference logic
-            # 80% use preferred, 20% random (simulate travel or other store in city) or just random overall?
-            # Let's keep it simple: 90% Preferred, 10% Other.
-            
-            # To pick "Other", we need a valid store_id. 
-            # We can pick a random store_id from the valid range [1, N_STORES].
-            # We need to know max_store_id or have the frame.
-            if stores_df is not None:
-                max_store_id = stores_df.height
-                
-                orders_flat = orders_flat.with_columns([
-                     pl.col("order_idx").hash(888).mod(1000).cast(pl.Float32).truediv(1000.0).alias("store_rnd"),
-                     (pl.col("order_idx").hash(999).mod(max_store_id) + 1).cast(pl.UInt32).alias("random_store_id")
-                ])
-                
-                orders_flat = orders_flat.with_columns(
-                    pl.when(pl.col("store_rnd") < 0.90)
-                    .then(pl.col("preferred_store_id"))
-                    .otherwise(pl.col("random_store_id"))
-                    .alias("store_id")
-                )
-                 
-                # Fill nulls (if any customer has no preference) with random
-                orders_flat = orders_flat.with_columns(
-                    pl.col("store_id").fill_null(pl.col("random_store_id"))
-                )
-
-                # Generate POS ID and Cashier
-                orders_flat = orders_flat.with_columns([
-                    # POS: StoreID-BoxNumber (1..8)
-                    (pl.col("store_id").cast(pl.String) + "-" + 
-                     (pl.col("order_idx").hash(11).mod(8) + 1).cast(pl.String)).alias("pos_id"),
-                     
-                    # Cashier: StoreID-User (1..20)
-                    (pl.col("store_id").cast(pl.String) + "-" + 
-                     (pl.col("order_idx").hash(22).mod(20) + 1).cast(pl.String)).alias("cashier_id")
-                ])
-            else:
-                 # Should not happen in this phase if wired correctly
-                 orders_flat = orders_flat.with_columns(pl.lit(1).alias("store_id"))
+        orders_flat = orders_flat.join(customers_lazy, on="cust_idx", how="left", maintain_order="left")
+
+        # Etapa C: post-joins (tienda, POS/cajero, montos)
+        total_amount = (pl.col("quantity") * pl.col("base_price") * pl.col("price_factor")
+                        ).round(2).alias("total_amount")
+        if has_stores:
+            # 90% Preferred, 10% Other (random store); customers without preference get the random one
+            store_id = (
+                pl.when((field(h_store, 0, 16, 1000) < 900) & pl.col("preferred_store_id").is_not_null())
+                .then(pl.col("preferred_store_id"))
+                .otherwise(pl.col("random_store_id"))
+            )
+            orders_flat = orders_flat.with_columns([
+                store_id.alias("store_id"),
+                # POS box (1..8) y cajero (1..20) como enteros; el texto StoreID-N se arma en el select final
+                (field(h_store, 16, 16, 8) + 1).cast(pl.UInt8).alias("pos_box"),
+                (field(h_store, 32, 16, 20) + 1).cast(pl.UInt8).alias("cashier_user"),
+                total_amount,
+            ])
         else:
-             orders_flat = orders_flat.with_columns(pl.lit(1).alias("store_id"))
-
-        # Calculate Amounts (Total)
-        orders_flat = orders_flat.with_columns([
-            ((pl.col("order_idx").hash(555).mod(100).cast(
-                pl.Float32) / 1000.0) + 0.95).alias("price_factor")
-        ])
-
-        orders_flat = orders_flat.with_columns([
-            (pl.col("quantity") * pl.col("base_price") * pl.col("price_factor")
-             ).round(2).alias("total_amount")
-        ])
+            orders_flat = orders_flat.with_columns([pl.lit(1).alias("store_id"), total_amount])
 
         # Add String Noise
         orders_flat = chaos_eng.inject_string_noise(
@@ -356,11 +338,9 @@ class SalesDataset(BaseDataset):
 
         # Create final Customer mix name
         orders_flat = orders_flat.with_columns(
-            (pl.col("first_name") + " " + pl.col("last_name")).alias("customer_name")
+            pl.concat_str([pl.col("first_name"), pl.col("last_name")], separator=" ").alias("customer_name")
         )
 
-        orders_flat = orders_flat.sort("order_date")
-
         # SELECT FINAL COLUMNS
         # Define columns to select (robust check if they exist)
         cols = [
@@ -382,26 +362,33 @@ class SalesDataset(BaseDataset):
             "total_amount"
         ]
         
-        # Add store cols if exist
-        avail_cols = orders_flat.collect_schema().names()
-        if "store_id" in avail_cols:
-            cols.extend(["store_id", "pos_id", "cashier_id"])
+        # Store cols (POS/cashier solo con dimensión de tiendas)
+        cols.append("store_id")
+        if has_stores:
+            cols.extend([
+                # POS: StoreID-BoxNumber | Cashier: StoreID-User
+                pl.concat_str([pl.col("store_id"), pl.col("pos_box")], separator="-").alias("pos_id"),
+                pl.concat_str([pl.col("store_id"), pl.col("cashier_user")], separator="-").alias("cashier_id"),
+            ])
             
         final_table = orders_flat.select(cols)
 
         # 5. Pagos (Payments)
         methods = ["Credit Card", "Debit Card",
                    "PayPal", "Bank Transfer", "Cash"]
+        # Campos de pago desde _h_cust (ya calculado en órdenes, sin re-hash)
+        m_roll = field(h_cust, 28, 10, 100)
 
         payments_lf = orders_lf.select([
             pl.col("order_id"),
             pl.col("order_idx"),
-            pl.col("order_date")
+            pl.col("order_date"),
+            pl.col("_h_cust"),
         ])
 
         payments_lf = payments_lf.with_columns([
             pl.col("order_id").alias("payment_id"),
-            (pl.col("order_date") + pl.duration(days=pl.col("order_idx").hash(101).mod(4))
+            (pl.col("order_date") + pl.duration(days=field(h_cust, 24, 4, 4))
              ).alias("payment_date"),
         ])
 
@@ -410,14 +397,15 @@ class SalesDataset(BaseDataset):
             on="order_id",
             how="inner"
         ).with_columns([
-            (pl.col("order_idx").hash(102).mod(100).map_elements(
-                lambda x: methods[0] if x < 40 else (
-                    methods[1] if x < 70 else (
-                        methods[2] if x < 85 else (
-                            methods[3] if x < 95 else
-                            methods[4]))), return_dtype=pl.String).alias("payment_method")),
-
-            (pl.col("order_idx").hash(103).mod(100) < 95).alias("is_success")
+            # 40/30/15/10/5 % split, same when/then ladder as quantity
+            pl.when(m_roll < 40).then(pl.lit(methods[0]))
+            .when(m_roll < 70).then(pl.lit(methods[1]))
+            .when(m_roll < 85).then(pl.lit(methods[2]))
+            .when(m_roll < 95).then(pl.lit(methods[3]))
+            .otherwise(pl.lit(methods[4]))
+            .alias("payment_method"),
+
+            (field(h_cust, 38, 10, 100) < 95).alias("is_success")
         ]).with_columns(
             pl.when(pl.col("is_success")).then(pl.lit("COMPLETED"))
             .otherwise(pl.lit("FAILED")).alias("status")
@@ -428,26 +416,17 @@ class SalesDataset(BaseDataset):
         # 6. Chaos Injection
         from yupay.core.chaos import ChaosEngine
         chaos = ChaosEngine(config)
-        
-        # Apply to Orders (Must be Eager for Chaos)
-        if isinstance(final_table, pl.LazyFrame):
-            orders_eager = final_table.collect()
-        else:
-            orders_eager = final_table
-            
-        orders_final = chaos.apply(orders_eager, "orders")
-        
-        # Apply to Payments
-        if isinstance(payments_enriched, pl.LazyFrame):
-             payments_eager = payments_enriched.collect()
-        else:
-             payments_eager = payments_enriched
 
-        payments_final = chaos.apply(payments_eager, "payments")
+        # Chaos stays lazy: the sink collects each table once
+        orders_final = chaos.apply(final_table.lazy(), "orders")
+        payments_final = chaos.apply(payments_enriched.lazy(), "payments")
 
-        return {
+        result = {
             "customers": customers_lazy.drop("cust_idx"),
             "products": products_lazy.drop("prod_idx"),
-            "orders": orders_final.lazy(), # Re-lazy for consistency, though currently eager due to join
-            "payments": payments_final.lazy()
+            "orders": orders_final,
+            "payments": payments_final
         }
+        if tables is not None:
+            result = {t: result[t] for t in tables if t in result}
+        return result
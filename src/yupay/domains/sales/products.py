@@ -1,6 +1,7 @@
 import polars as pl
 from yupay.core.generator import BaseGenerator
 from yupay.core.random import Randomizer
+from yupay.core.chaos import ChaosEngine
 
 
 class ProductGenerator(BaseGenerator):
@@ -87,9 +88,8 @@ class ProductGenerator(BaseGenerator):
             base_price=pl.col("base_price").cast(pl.Decimal(10, 2))
         )
 
-        # Chaos Injection
-        from yupay.core.chaos import ChaosEngine
+        # Chaos Injection (skipped entirely when there are no rules for products)
+        if not ChaosEngine.is_active(self.config, "products"):
+            return df.lazy()
         chaos = ChaosEngine(self.config)
-        df_eager = chaos.apply(df, "products")
-
-        return df_eager.lazy()
+        return chaos.apply(df.lazy(), "products")
@@ -22,6 +22,7 @@ class ParquetSink(BaseSink):
 
         # Conteo eficiente
         count = pl.scan_parquet(file_path).select(pl.len()).collect().item()
+        self._record_written(file_path)
         return file_path, count
 
 
@@ -38,9 +39,10 @@ class CsvSink(BaseSink):
             raise OSError(
                 "Espacio en disco insuficiente (< 20GB libres) para escribir CSV.")
 
-        df = lazy_df.collect(streaming=True)
+        df = lazy_df.collect(engine="streaming")
         count = df.height
         df.write_csv(file_path)
+        self._record_written(file_path)
         return file_path, count
 
 
@@ -54,7 +56,7 @@ class DuckDBSink(BaseSink):
 
         import duckdb
         with duckdb.connect(str(db_path)) as con:
-            df = lazy_df.collect(streaming=True)
+            df = lazy_df.collect(engine="streaming")
             arrow_table = df.to_arrow()
 
             # Si part_id > 0, insertamos en lugar de crear
@@ -66,6 +68,7 @@ class DuckDBSink(BaseSink):
 
             count = con.sql(f"SELECT count(*) FROM {name}").fetchone()[0]
 
+        self._record_written(db_path)
         return db_path, count
 
 
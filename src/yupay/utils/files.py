@@ -1,12 +1,20 @@
 
+import os
 import pathlib
 import shutil
 from typing import List, Dict, Any, Tuple
 
 
 def get_dir_size(path: pathlib.Path) -> int:
-    """Recursively calculates directory size in bytes."""
-    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    """Recursively calculates directory size in bytes (single os.scandir walk)."""
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                total += get_dir_size(entry.path)
+            elif entry.is_file():
+                total += entry.stat().st_size
+    return total
 
 
 def format_size(size_bytes: int) -> str:
@@ -16,10 +24,11 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes / (1024**2):.2f} MB"
 
 
-def list_datasets(data_root: str = "data") -> Dict[str, List[Dict[str, Any]]]:
+def list_datasets(data_root: str = "data", domain_filter: str = None) -> Dict[str, List[Dict[str, Any]]]:
     """
     Scans data_root for datasets.
     Structure: data/[domain]/data_timestamp
+    If domain_filter is given, other domains are skipped without being stat'ed.
     Returns: {domain: [{run_id, size_raw, size_fmt, path, date}]}
     """
     root = pathlib.Path(data_root)
@@ -29,28 +38,35 @@ def list_datasets(data_root: str = "data") -> Dict[str, List[Dict[str, Any]]]:
     results = {}
 
     # Iterate over domains (directories in root)
-    for domain_dir in [d for d in root.iterdir() if d.is_dir()]:
-        domain_name = domain_dir.name
-        runs = []
-
-        # Iterate over runs (data_* folders)
-        for run_dir in sorted(domain_dir.glob("data_*"), reverse=True):
-            if not run_dir.is_dir():
-                continue
+    with os.scandir(root) as it:
+        domain_entries = [
+            e for e in it
+            if (domain_filter is None or e.name == domain_filter) and e.is_dir()
+        ]
+
+    for domain_entry in domain_entries:
+        # Iterate over runs (data_* folders), newest first
+        with os.scandir(domain_entry.path) as it:
+            run_entries = sorted(
+                (e for e in it if e.name.startswith("data_") and e.is_dir()),
+                key=lambda e: e.name, reverse=True
+            )
 
-            size = get_dir_size(run_dir)
-            run_id = run_dir.name.replace("data_", "")
+        runs = []
+        for run_entry in run_entries:
+            size = get_dir_size(run_entry.path)
+            run_id = run_entry.name.replace("data_", "")
 
             runs.append({
                 "run_id": run_id,
                 "size_bytes": size,
                 "size_formatted": format_size(size),
-                "path": str(run_dir),
-                "timestamp": run_dir.stat().st_mtime
+                "path": run_entry.path,
+                "timestamp": run_entry.stat().st_mtime
             })
 
         if runs:
-            results[domain_name] = runs
+            results[domain_entry.name] = runs
 
     return results
 
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+from yupay.core.sink import BackgroundWriter
+
+
+class FlakySink:
+    """Fake sink: records writes and fails on the second one."""
+
+    def __init__(self):
+        self.calls = 0
+        self.written = []
+
+    def write(self, name, lazy_df, rows_estimated, part_id=None):
+        self.calls += 1
+        if self.calls == 2:
+            raise OSError("disk full")
+        self.written.append((name, part_id))
+        return Path(f"{name}_{part_id}.parquet"), lazy_df.collect().height
+
+
+def test_background_writer_reraises_and_exits():
+    """
+    A failed write is re-raised by close(), later batches are drained (not written, no hang)
+    and the writer thread exits.
+    """
+    sink = FlakySink()
+    written = []
+    writer = BackgroundWriter(sink, lambda name, path, count: written.append((name, count)))
+    lf = pl.LazyFrame({"x": [1, 2, 3]})
+
+    writer.submit("orders", lf, 3, part_id=0)
+    writer.submit("orders", lf, 3, part_id=1)
+    # The producer may or may not see the error yet; either way it must not block forever
+    try:
+        writer.submit("orders", lf, 3, part_id=2)
+    except OSError:
+        pass
+
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+
+    assert not writer._thread.is_alive()
+    assert sink.written == [("orders", 0)]
+    assert written == [("orders", 3)]
+
+
+def test_background_writer_submit_after_failure_raises():
+    """
+    Once the writer thread has failed, submit() raises instead of queueing more work.
+    """
+    sink = FlakySink()
+    sink.calls = 1  # next write is the failing one
+    writer = BackgroundWriter(sink, lambda *a: None)
+    lf = pl.LazyFrame({"x": [1]})
+
+    writer.submit("payments", lf, 1, part_id=0)
+    with pytest.raises(OSError):
+        writer.close()
+
+    with pytest.raises(OSError):
+        writer.submit("payments", lf, 1, part_id=1)
+    assert sink.written == []
@@ -0,0 +1,71 @@
+import polars as pl
+import pytest
+from yupay.core.random import Randomizer
+
+
+# Hashes reales + extremos (todo ceros / todo unos) para cubrir los bordes de cada campo
+HASHES = pl.concat([
+    pl.int_range(0, 5000, dtype=pl.UInt64, eager=True).hash(seed=123),
+    pl.Series([0, 2**64 - 1, 2**63, 2**32 - 1], dtype=pl.UInt64),
+])
+
+
+@pytest.mark.parametrize("offset,width", [(0, 16), (48, 16), (28, 10), (24, 4), (0, 24), (24, 24), (40, 24)])
+@pytest.mark.parametrize("n_options", [1, 4, 20, 100, 1000, 65535, 2**24])
+def test_hash_field_index_range(offset, width, n_options):
+    """
+    Indices stay in [0, n_options) and equal (field * n) >> width, on both the UInt32 and UInt64 paths.
+    """
+    out = pl.DataFrame({"h": HASHES}).select(
+        Randomizer.hash_field_index(pl.col("h"), offset, width, n_options).alias("i")
+    )["i"]
+
+    assert out.dtype == pl.UInt32
+    assert out.null_count() == 0
+    assert out.min() >= 0 and out.max() < n_options
+
+    expected = [(((h >> offset) & (2**width - 1)) * n_options) >> width for h in HASHES.to_list()]
+    assert out.to_list() == expected
+
+
+def test_hash_field_index_single_option():
+    """
+    n_options = 1 (clamped empty branches) always maps to index 0.
+    """
+    out = pl.DataFrame({"h": HASHES}).select(Randomizer.hash_field_index(pl.col("h"), 0, 24, 1))
+    assert out.to_series().unique().to_list() == [0]
+
+
+def test_hash_field_index_rejects_empty():
+    """
+    n_options = 0 is rejected when the expression is built.
+    """
+    with pytest.raises(ValueError):
+        Randomizer.hash_field_index(pl.col("h"), 0, 16, 0)
+
+
+def test_grouped_choice_expr_within_group_slice():
+    """
+    Each row picks a value inside its group's [offset, offset + count) slice.
+    """
+    offsets = [0, 3, 4, 10]
+    counts = [3, 1, 6, 2]
+    # values = posición, así el valor elegido es directamente el índice del gather
+    values = pl.int_range(0, 12, dtype=pl.UInt32, eager=True)
+
+    df = pl.DataFrame({
+        "group": pl.int_range(0, 4000, eager=True) % 4,
+        "key": pl.int_range(0, 4000, dtype=pl.UInt32, eager=True),
+    })
+    out = df.with_columns(
+        Randomizer.grouped_choice_expr(
+            values, offsets, counts,
+            group_code=pl.col("group"), key=pl.col("key"), seed=999,
+        ).alias("pick")
+    )
+
+    lo = pl.col("group").replace_strict(list(range(4)), offsets)
+    hi = pl.col("group").replace_strict(list(range(4)), [o + c for o, c in zip(offsets, counts)])
+    assert out.filter((pl.col("pick") < lo) | (pl.col("pick") >= hi)).height == 0
+    # Every slot of every group is reachable
+    assert out["pick"].n_unique() == 12
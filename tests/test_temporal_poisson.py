@@ -0,0 +1,52 @@
+import random
+
+import pytest
+from yupay.core.temporal import poisson_icdf, poisson_batch, POISSON_EXACT_MAX_LAMBDA
+
+
+N = 20000
+# Uniformes estratificados: momentos muestrales estables sin depender de una semilla
+STRATIFIED_U = [(i + 0.5) / N for i in range(N)]
+
+
+@pytest.mark.parametrize("lam", [0.5, 5.0, 30.0, POISSON_EXACT_MAX_LAMBDA, 64.5, 100.0, 1000.0])
+def test_poisson_moments(lam):
+    """
+    Mean and variance match lambda on both sides of the exact / Cornish-Fisher switch.
+    """
+    draws = poisson_batch([lam] * N, STRATIFIED_U)
+    mean = sum(draws) / N
+    var = sum((x - mean) ** 2 for x in draws) / N
+
+    assert mean == pytest.approx(lam, rel=0.005)
+    assert var == pytest.approx(lam, rel=0.02)
+
+
+def test_poisson_zero_lambda():
+    """
+    lambda = 0 always yields 0 events.
+    """
+    assert poisson_batch([0.0] * 100, STRATIFIED_U[::200]) == [0] * 100
+
+
+@pytest.mark.parametrize("lam", [1.0, 10.0, POISSON_EXACT_MAX_LAMBDA, 65.0, 1000.0])
+def test_poisson_upper_tail(lam):
+    """
+    u -> 1 terminates with a finite count in the upper tail (no endless CDF walk).
+    """
+    u = 1.0 - 2**-53
+    k = poisson_icdf(u, lam)
+    assert lam < k < lam + 20 * lam ** 0.5 + 20
+    assert k >= poisson_icdf(0.999, lam)
+
+
+def test_poisson_same_uniforms_same_counts():
+    """
+    Same uniforms give the same counts (one uniform per draw, nothing hidden).
+    """
+    rng = random.Random(7)
+    lams = [rng.uniform(0, 200) for _ in range(500)]
+    uniforms = [rng.random() for _ in range(500)]
+
+    assert poisson_batch(lams, uniforms) == poisson_batch(lams, list(uniforms))
+    assert poisson_batch(lams, uniforms) == [poisson_icdf(u, lam) for u, lam in zip(uniforms, lams)]